@@ -3,12 +3,14 @@ import crypt
 import os
 import sys
 import types
-import time
-import copy
 import logging
 import glob
+import hashlib
+import time
+import hmac
 from collections import OrderedDict
-from functools import partial
+from functools import partial, singledispatch
+from operator import attrgetter
 from pprint import pformat
 
 import asyncssh
@@ -21,6 +23,8 @@ from biothings.utils.hub import (HubShell, get_hub_reloader, CommandDefinition,
 from biothings.utils.jsondiff import make as jsondiff
 from biothings.utils.version import check_new_version, get_version
 from biothings.utils.common import get_class_from_classpath
+from biothings.utils.hub_db import ChangeListener, ChangeWatcher
+from biothings.hub.api import EndpointDefinition
 
 # Keys used as category in pinfo (description of jobs submitted to JobManager)
 # Those are used in different places
@@ -42,7 +46,12 @@ INSPECTOR_CATEGORY = "inspector"
 #     config, "HUB_REFRESH_COMMANDS"
 # ) and config.HUB_REFRESH_COMMANDS or "* * * * * *"  # every sec
 HUB_REFRESH_COMMANDS = getattr(
-    config, "HUB_REFRESH_COMMANDS", "* * * * * *"  # every sec
+    config, "HUB_REFRESH_COMMANDS", "* * * * * */10"  # every 10 sec
+)
+
+# Default schedule for managers polling pending actions (uploads, diffs, snapshots...)
+HUB_POLL_SCHEDULE = getattr(
+    config, "HUB_POLL_SCHEDULE", "* * * * * */30"  # every 30 sec
 )
 
 # Check for new code update from app and biothings Git repo
@@ -53,33 +62,32 @@ HUB_CHECK_UPGRADE = getattr(
 
 class JobRenderer(object):
     def __init__(self):
-        self.rendered = {
-            types.FunctionType: self.render_func,
-            types.MethodType: self.render_method,
-            partial: self.render_partial,
-            types.LambdaType: self.render_lambda,
-        }
-
-    def render(self, job):
-        r = self.rendered.get(type(job._callback))
-        rstr = r(job._callback)
-        delta = job._when - job._loop.time()
-        days = None
-        if delta > 86400:
-            days = int(delta / 86400)
-            delta = delta - 86400
-        strdelta = time.strftime("%Hh:%Mm:%Ss", time.gmtime(int(delta)))
-        if days:
+        # dispatched on callback's type (lambdas are FunctionType too)
+        self.render_callback = singledispatch(self.render_other)
+        self.render_callback.register(types.FunctionType, self.render_func)
+        self.render_callback.register(types.MethodType, self.render_method)
+        self.render_callback.register(partial, self.render_partial)
+
+    def render(self, job, now=None):
+        rstr = self.render_callback(job._callback)
+        if now is None:
+            now = job._loop.time()
+        delta = job._when - now
+        days, secs = divmod(int(delta), 86400)
+        hours, secs = divmod(secs, 3600)
+        mins, secs = divmod(secs, 60)
+        strdelta = "%02dh:%02dm:%02ds" % (hours, mins, secs)
+        if days > 0:
             strdelta = "%d day(s) %s" % (days, strdelta)
         return "%s {run in %s}" % (rstr, strdelta)
 
     def render_partial(self, p):
         # class.method(args)
-        return self.rendered[type(p.func)](p.func) + "%s" % str(p.args)
+        return self.render_callback(p.func) + "%s" % str(p.args)
 
     def render_cron(self, c):
         # func type associated to cron can vary
-        return self.rendered[type(c.func)](c.func) + " [%s]" % c.spec
+        return self.render_callback(c.func) + " [%s]" % c.spec
 
     def render_func(self, f):
         return f.__name__
@@ -95,15 +103,54 @@ class JobRenderer(object):
     def render_lambda(self, l):
         return l.__name__
 
+    def render_other(self, o):
+        # builtins, callable objects, etc...
+        return repr(o)
+
 
 renderer = JobRenderer()
 
 
-def status(managers):
+class StatusListener(ChangeListener):
+    """
+    Keep the last hub status computed by status(), until hub db reports
+    a change on one of the collections it's computed from. Changes are only
+    reported when made from this process, so status also expires after "ttl"
+    seconds (default matches HUB_REFRESH_COMMANDS's default period)
+    """
+
+    entities = ("source", "data_plugin", "build", "build_config", "api")
+
+    def __init__(self, ttl=10):
+        self.ttl = ttl
+        self.status = None
+        self.computed_at = None
+
+    def get(self):
+        if self.status is not None and time.time() - self.computed_at < self.ttl:
+            return self.status
+
+    def set(self, status):
+        self.status = status
+        self.computed_at = time.time()
+
+    def read(self, event):
+        if event.get("obj") in self.entities:
+            self.status = None
+
+
+def status(managers, listener=None):
     """
     Return a global hub status (number or sources, documents, etc...)
-    according to available managers
+    according to available managers. If a StatusListener is passed,
+    status is only computed again when something changed since last call
+    (or when cached status expired).
     """
+    if listener:
+        cached = listener.get()
+        if cached is not None:
+            return cached
+    failed = False
     total_srcs = None
     total_docs = None
     total_confs = None
@@ -115,33 +162,42 @@ def status(managers):
             srcm = managers["source_manager"]
             srcs = srcm.get_sources()
             total_srcs = len(srcs)
-            total_docs = sum([s["upload"]["sources"][subs].get("count", 0) or 0
-                              for s in srcs
-                              for subs in s.get("upload", {}).get("sources", {})
-                              if s.get("upload")])
+            total_docs = 0
+            for src in srcs:
+                upload = src.get("upload")
+                if not upload:
+                    continue
+                for sub in upload.get("sources", {}).values():
+                    total_docs += sub.get("count", 0) or 0
         except Exception:
+            failed = True
             logging.exception("Can't get stats for sources:")
 
-    try:
+    if managers.get("build_manager"):
         bm = managers["build_manager"]
-        total_confs = len(bm.build_config_info())
-    except Exception:
-        logging.exception("Can't get total number of build configurations:")
-    try:
-        total_builds = len(bm.build_info())
-    except Exception:
-        logging.exception("Can't get total number of builds:")
+        try:
+            total_confs = len(bm.build_config_info())
+        except Exception:
+            failed = True
+            logging.exception("Can't get total number of build configurations:")
+        try:
+            total_builds = len(bm.build_info())
+        except Exception:
+            failed = True
+            logging.exception("Can't get total number of builds:")
 
-    try:
-        am = managers["api_manager"]
-        apis = am.get_apis()
-        total_apis = len(apis)
-        total_running_apis = len(
-            [a for a in apis if a.get("status") == "running"])
-    except Exception:
-        logging.exception("Can't get stats for APIs:")
+    if managers.get("api_manager"):
+        try:
+            am = managers["api_manager"]
+            apis = am.get_apis()
+            total_apis = len(apis)
+            total_running_apis = len(
+                [a for a in apis if a.get("status") == "running"])
+        except Exception:
+            failed = True
+            logging.exception("Can't get stats for APIs:")
 
-    return {
+    res = {
         "source": {
             "total": total_srcs,
             "documents": total_docs
@@ -157,35 +213,73 @@ def status(managers):
             "running": total_running_apis
         },
     }
+    if listener and not failed:
+        listener.set(res)
 
+    return res
+
+
+# last rendered schedule, as (loop, second, output). Delays are rendered
+# with a one second resolution, so output is reused within the same second
+last_schedule = (None, None, None)
+# asyncio internal callbacks, not worth listing as scheduled jobs
+_SKIP_CALLBACK_NAMES = {"_wakeup", "__wakeup", "task_wakeup", "_call_check_cancel",
+                        "_run_until_complete_cb", "_set_result_unless_cancelled"}
 
-def get_schedule(loop):
-    """try to render job in a human-readable way..."""
-    out = []
-    for sch in loop._scheduled:
-        if type(sch) != asyncio.events.TimerHandle:
-            continue
-        if sch._cancelled:
-            continue
-        try:
-            info = renderer.render(sch)
-            out.append(info)
-        except Exception:
-            import traceback
-            traceback.print_exc()
-            out.append(sch)
 
-    return "\n".join(out)
+def _callback_name(handle):
+    cb = handle._callback
+    return getattr(cb, "__name__", None) or getattr(getattr(cb, "func", None), "__name__", "")
+
+
+def _render_job(sch, now):
+    try:
+        return renderer.render(sch, now=now)
+    except Exception:
+        logging.exception("Can't render scheduled job %s", sch)
+        return str(sch)
 
 
-@asyncio.coroutine
-def start_ssh_server(loop,
-                     name,
-                     passwords,
-                     keys=['bin/ssh_host_key'],
-                     shell=None,
-                     host='',
-                     port=8022):
+def get_schedule(loop):
+    """try to render job in a human-readable way..."""
+    global last_schedule
+    if not hasattr(loop, "_scheduled"):
+        # not a pure-python loop (uvloop, when HUB_USE_UVLOOP is set),
+        # scheduled handles aren't accessible
+        return "Scheduled jobs can't be listed with loop %s" % loop
+    now = loop.time()
+    if last_schedule[0] is loop and last_schedule[1] == int(now):
+        return last_schedule[2]
+    # _scheduled is a heap, sort so next jobs come first
+    handles = sorted((sch for sch in loop._scheduled
+                      # cheapest tests first
+                      if not sch._cancelled and sch.__class__ is asyncio.TimerHandle
+                      and _callback_name(sch) not in _SKIP_CALLBACK_NAMES),
+                     key=attrgetter("_when"))
+    res = "\n".join([_render_job(sch, now) for sch in handles])
+    last_schedule = (loop, int(now), res)
+    return res
+
+
+def diff_pending(diff_manager, doc):
+    """Diff build 'doc' flagged as pending "diff" with its previous one"""
+    return diff_manager.diff("jsondiff-selfcontained", old=None, new=doc["_id"])
+
+
+def upload_pending(hub, doc):
+    """Launch upload for source 'doc' flagged as pending "upload" """
+    # shell is resolved at call time, it's set up after managers
+    return hub.shell.launch(
+        partial(hub.managers["upload_manager"].upload_src, doc["_id"]))
+
+
+async def start_ssh_server(loop,
+                           name,
+                           passwords,
+                           keys=['bin/ssh_host_key'],
+                           shell=None,
+                           host='',
+                           port=8022):
     for key in keys:
         assert os.path.exists(
             key
@@ -194,15 +288,17 @@ def start_ssh_server(loop,
     HubSSHServer.PASSWORDS = passwords
     HubSSHServer.NAME = name
     HubSSHServer.SHELL = shell
+    # finished commands are processed as soon as their jobs are done (see
+    # HubShell.job_done()), that's a fallback, it can be slow
     aiocron.crontab(HUB_REFRESH_COMMANDS,
                     func=shell.__class__.refresh_commands,
                     start=True,
                     loop=loop)
-    yield from asyncssh.create_server(HubSSHServer,
-                                      host,
-                                      port,
-                                      loop=loop,
-                                      server_host_keys=keys)
+    await asyncssh.create_server(HubSSHServer,
+                                 host,
+                                 port,
+                                 loop=loop,
+                                 server_host_keys=keys)
 
 
 class HubCommands(OrderedDict):
@@ -220,7 +316,9 @@ class HubServer(object):
         "terminal", "reloader", "dataupload", "ws", "readonly", "upgrade",
         "autohub","hooks",
     ]
-    DEFAULT_MANAGERS_ARGS = {"upload": {"poll_schedule": "* * * * * */10"}}
+    # read-only, shared by all instances
+    DEFAULT_MANAGERS_ARGS = types.MappingProxyType({
+        "upload": types.MappingProxyType({"poll_schedule": HUB_POLL_SCHEDULE})})
     DEFAULT_RELOADER_CONFIG = {
         "folders": None,  # will use default one
         "managers": ["source_manager", "assistant_manager"],
@@ -236,12 +334,141 @@ class HubServer(object):
         "indexer_factory": getattr(config, "AUTOHUB_INDEXER_FACTORY", None),
         "es_host": getattr(config, "AUTOHUB_ES_HOST", None),
     }
+    # hidden commands registered when their manager is configured, as
+    # (manager name, [(command name, manager attribute or None for manager itself, tracked)])
+    DEFAULT_EXTRA_COMMANDS = (
+        ("job_manager", [
+            ("pqueue", "process_queue", False),
+            ("tqueue", "thread_queue", False),
+            ("jm", None, False),
+            ("top", "top", False),
+            ("job_info", "job_info", False),
+            ("schedule", "schedule", False)]),
+        ("source_manager", [
+            ("sm", None, False),
+            ("sources", "get_sources", False),
+            ("source_save_mapping", "save_mapping", True)]),
+        ("dump_manager", [
+            ("dm", None, False),
+            ("dump_info", "dump_info", False)]),
+        ("dataplugin_manager", [("dpm", None, False)]),
+        ("assistant_manager", [("am", None, False)]),
+        ("upload_manager", [
+            ("um", None, False),
+            ("upload_info", "upload_info", False)]),
+        ("build_manager", [
+            ("bm", None, False),
+            ("builds", "build_info", False),
+            ("build_config_info", "build_config_info", False),
+            ("build_save_mapping", "save_mapping", True),
+            ("create_build_conf", "create_build_configuration", True),
+            ("update_build_conf", "update_build_configuration", True),
+            ("delete_build_conf", "delete_build_configuration", True)]),
+        ("diff_manager", [
+            ("dim", None, False),
+            ("diff_info", "diff_info", False)]),
+        ("sync_manager", [("sym", None, False)]),
+        ("index_manager", [
+            ("im", None, False),
+            ("index_info", "index_info", False),
+            ("validate_mapping", "validate_mapping", True)]),
+        ("snapshot_manager", [
+            ("ssm", None, False),
+            ("snapshot_info", "snapshot_info", False)]),
+        ("release_manager", [
+            ("rm", None, False),
+            ("release_info", "release_info", False),
+            ("reset_synced", "reset_synced", True)]),
+        ("inspect_manager", [("ism", None, False)]),
+        ("api_manager", [
+            ("api", None, False),
+            ("get_apis", "get_apis", False),
+            ("delete_api", "delete_api", True),
+            ("create_api", "create_api", True),
+            ("start_api", "start_api", True),
+            ("stop_api", "stop_api", True)]),
+    )
+    # API endpoints registered when their command is defined, as
+    # (command name, endpoint path, EndpointDefinition args, is_list). Endpoints
+    # sharing a path with is_list=True are grouped in a list, in that order
+    DEFAULT_API_ENDPOINTS = (
+        ("config", "config", {"name": "config", "method": "get"}, True),
+        ("config", "config", {"name": "setconf", "method": "put", "force_bodyargs": True}, True),
+        ("config", "config", {"name": "resetconf", "method": "delete", "force_bodyargs": True}, True),
+        ("builds", "builds", {"name": "builds", "method": "get"}, False),
+        ("build", "build", {"name": "build", "method": "get"}, True),
+        ("archive", "build", {"name": "archive", "method": "post", "suffix": "archive"}, True),
+        ("rmmerge", "build", {"name": "rmmerge", "method": "delete"}, True),
+        ("merge", "build", {"name": "merge", "method": "put", "suffix": "new"}, True),
+        ("build_save_mapping", "build", {"name": "build_save_mapping", "method": "put", "suffix": "mapping"}, True),
+        ("publish_diff", "publish",
+         {"name": "publish_diff", "method": "post", "suffix": "incremental", "force_bodyargs": True}, True),
+        ("publish_snapshot", "publish",
+         {"name": "publish_snapshot", "method": "post", "suffix": "full", "force_bodyargs": True}, True),
+        ("diff", "diff", {"name": "diff", "method": "put", "force_bodyargs": True}, False),
+        ("job_info", "job_manager", {"name": "job_info", "method": "get"}, False),
+        ("dump_info", "dump_manager", {"name": "dump_info", "method": "get"}, False),
+        ("upload_info", "upload_manager", {"name": "upload_info", "method": "get"}, False),
+        ("build_config_info", "build_manager", {"name": "build_config_info", "method": "get"}, False),
+        ("index_info", "index_manager", {"name": "index_info", "method": "get"}, False),
+        ("snapshot_info", "snapshot_manager", {"name": "snapshot_info", "method": "get"}, False),
+        ("release_info", "release_manager", {"name": "release_info", "method": "get"}, False),
+        ("reset_synced", "release_manager/reset_synced", {"name": "reset_synced", "method": "put"}, False),
+        ("diff_info", "diff_manager", {"name": "diff_info", "method": "get"}, False),
+        ("commands", "commands", {"name": "commands", "method": "get"}, False),
+        ("command", "command", {"name": "command", "method": "get"}, False),
+        ("sources", "sources", {"name": "sources", "method": "get"}, False),
+        ("source_info", "source", {"name": "source_info", "method": "get"}, True),
+        ("source_reset", "source", {"name": "source_reset", "method": "post", "suffix": "reset"}, True),
+        ("dump", "source", {"name": "dump", "method": "put", "suffix": "dump"}, True),
+        ("upload", "source", {"name": "upload", "method": "put", "suffix": "upload"}, True),
+        ("source_save_mapping", "source", {"name": "source_save_mapping", "method": "put", "suffix": "mapping"}, True),
+        ("inspect", "inspect", {"name": "inspect", "method": "put", "force_bodyargs": True}, False),
+        ("register_url", "dataplugin/register_url",
+         {"name": "register_url", "method": "post", "force_bodyargs": True}, False),
+        ("unregister_url", "dataplugin/unregister_url",
+         {"name": "unregister_url", "method": "delete", "force_bodyargs": True}, False),
+        ("dump_plugin", "dataplugin", {"name": "dump_plugin", "method": "put", "suffix": "dump"}, True),
+        ("export_plugin", "dataplugin", {"name": "export_plugin", "method": "put", "suffix": "export"}, True),
+        ("jsondiff", "jsondiff", {"name": "jsondiff", "method": "post", "force_bodyargs": True}, False),
+        ("validate_mapping", "mapping/validate",
+         {"name": "validate_mapping", "method": "post", "force_bodyargs": True}, False),
+        ("create_build_conf", "buildconf", {"name": "create_build_conf", "method": "post", "force_bodyargs": True}, True),
+        ("create_build_conf", "buildconf", {"name": "update_build_conf", "method": "put", "force_bodyargs": True}, True),
+        ("delete_build_conf", "buildconf",
+         {"name": "delete_build_conf", "method": "delete", "force_bodyargs": True}, True),
+        ("index", "index", {"name": "index", "method": "put", "force_bodyargs": True}, False),
+        ("snapshot", "snapshot", {"name": "snapshot", "method": "put", "force_bodyargs": True}, False),
+        ("sync", "sync", {"name": "sync", "method": "post", "force_bodyargs": True}, False),
+        ("whatsnew", "whatsnew", {"name": "whatsnew", "method": "get"}, False),
+        ("status", "status", {"name": "status", "method": "get"}, False),
+        ("create_release_note", "release_note",
+         {"name": "create_release_note", "method": "put", "suffix": "create", "force_bodyargs": True}, True),
+        ("get_release_note", "release_note",
+         {"name": "get_release_note", "method": "get", "force_bodyargs": True}, True),
+        ("start_api", "api", {"name": "start_api", "method": "put", "suffix": "start"}, True),
+        ("stop_api", "api", {"name": "stop_api", "method": "put", "suffix": "stop"}, True),
+        ("delete_api", "api", {"name": "delete_api", "method": "delete", "force_bodyargs": True}, True),
+        ("create_api", "api", {"name": "create_api", "method": "post", "force_bodyargs": True}, True),
+        ("get_apis", "api/list", {"name": "get_apis", "method": "get"}, False),
+        ("stop", "stop", {"name": "stop", "method": "put"}, False),
+        ("restart", "restart", {"name": "restart", "method": "put"}, False),
+        ("list", "standalone", {"name": "list", "method": "get", "suffix": "list"}, True),
+        ("versions", "standalone", {"name": "versions", "method": "get", "suffix": "versions"}, True),
+        ("check", "standalone", {"name": "check", "method": "get", "suffix": "check"}, True),
+        ("info", "standalone", {"name": "info", "method": "get", "suffix": "info"}, True),
+        ("download", "standalone", {"name": "download", "method": "post", "suffix": "download"}, True),
+        ("apply", "standalone", {"name": "apply", "method": "post", "suffix": "apply"}, True),
+        ("install", "standalone", {"name": "install", "method": "post", "suffix": "install"}, True),
+        ("backend", "standalone", {"name": "backend", "method": "get", "suffix": "backend"}, True),
+        ("reset_backend", "standalone", {"name": "reset_backend", "method": "delete", "suffix": "backend"}, True),
+    )
 
     def __init__(self,
                  source_list,
                  features=None,
                  name="BioThings Hub",
-                 managers_custom_args={},
+                 managers_custom_args=None,
                  api_config=None,
                  reloader_config=None,
                  dataupload_config=None,
@@ -272,7 +499,7 @@ class HubServer(object):
         self._passed_features = features
         self._passed_managers_custom_args = managers_custom_args
         self.features = self.clean_features(features or self.DEFAULT_FEATURES)
-        self.managers_custom_args = managers_custom_args
+        self.managers_custom_args = managers_custom_args or {}
         self.reloader_config = reloader_config or self.DEFAULT_RELOADER_CONFIG
         self.dataupload_config = dataupload_config or self.DEFAULT_DATAUPLOAD_CONFIG
         self.websocket_config = websocket_config or self.DEFAULT_WEBSOCKET_CONFIG
@@ -291,6 +518,7 @@ class HubServer(object):
         self.routes = []
         self.readonly_routes = []
         self.ws_urls = []  # only one set, shared between r/w and r/o hub api server
+        self.loop = None  # set in configure_ioloop(), shared by all managers
         # flag "do we need to configure?"
         self.configured = False
 
@@ -333,7 +561,7 @@ class HubServer(object):
 
     def configure(self):
         self.before_configure()
-        self.remaining_features = copy.deepcopy(
+        self.remaining_features = list(
             self.features)  # keep track of what's been configured
         self.configure_ioloop()
         self.configure_managers()
@@ -364,7 +592,7 @@ class HubServer(object):
                 # read-only. "readonly" feature means we're running another webapp for
                 # a specific readonly API. UI can then query the root handler and see
                 # if the API is readonly or not, and adjust the components & actions
-                ro_features = copy.deepcopy(self.features)
+                ro_features = list(self.features)
                 # terminal feature certainly not allowed in read-only server...
                 if "terminal" in self.features:
                     ro_features.remove("terminal")
@@ -386,8 +614,21 @@ class HubServer(object):
         self.configured = True
 
     def configure_ioloop(self):
+        # optionally use uvloop (faster loop, scheduler implemented in C), only if
+        # HUB_USE_UVLOOP is set, being installed isn't enough: code relying on asyncio's
+        # pure-python loop or having already fetched the default loop would break.
+        # That must be done before any manager gets the loop (see configure_job_manager())
+        if getattr(config, "HUB_USE_UVLOOP", False):
+            try:
+                import uvloop
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+                self.logger.info("Using uvloop event loop")
+            except ImportError:
+                self.logger.warning("HUB_USE_UVLOOP is set but uvloop isn't installed, using asyncio's default loop")
         import tornado.platform.asyncio
         tornado.platform.asyncio.AsyncIOMainLoop().install()
+        # fetched once, every manager and command is bound to that same loop
+        self.loop = asyncio.get_event_loop()
 
     def before_start(self):
         pass
@@ -397,9 +638,8 @@ class HubServer(object):
             self.configure()
         self.logger.info("Starting '%s'", self.name)
         # can't use asyncio.get_event_loop() if python < 3.5.3 as it would return
-        # another instance of aio loop, take it from job_manager to make sure
-        # we share the same one
-        loop = self.managers["job_manager"].loop
+        # another instance of aio loop, use the one managers were configured with
+        loop = self.loop
         if self.routes:
             self.logger.info("Starting Hub API server on port %s" % config.HUB_API_PORT)
             #self.logger.info(self.routes)
@@ -441,17 +681,15 @@ class HubServer(object):
 
     def mixargs(self, feat, params=None):
         params = params or {}
-        args = {}
+        # custom args aren't modified, so they're the same for each call
+        custom = self.managers_custom_args.get(feat) or {}
+        args = dict(custom)
         for p in params:
-            args[p] = self.managers_custom_args.get(feat, {}).pop(
-                p, None) or params[p]
-        # mix remaining
-        args.update(self.managers_custom_args.get(feat, {}))
+            args[p] = custom.get(p) or params[p]
         return args
 
     def configure_job_manager(self):
-        import asyncio
-        loop = asyncio.get_event_loop()
+        loop = self.loop
         from biothings.utils.manager import JobManager
         args = self.mixargs(
             "job", {
@@ -470,7 +708,7 @@ class HubServer(object):
 
     def configure_upload_manager(self):
         from biothings.hub.dataload.uploader import UploaderManager
-        args = self.mixargs("upload", {"poll_schedule": "* * * * * */10"})
+        args = self.mixargs("upload", {"poll_schedule": HUB_POLL_SCHEDULE})
         upload_manager = UploaderManager(
             job_manager=self.managers["job_manager"], **args)
         self.managers["upload_manager"] = upload_manager
@@ -503,14 +741,12 @@ class HubServer(object):
         from biothings.hub.databuild.differ import DifferManager, SelfContainedJsonDiffer
         args = self.mixargs("diff")
         diff_manager = DifferManager(job_manager=self.managers["job_manager"],
-                                     poll_schedule="* * * * * */10",
+                                     poll_schedule=HUB_POLL_SCHEDULE,
                                      **args)
         diff_manager.configure([
             SelfContainedJsonDiffer,
         ])
-        diff_manager.poll(
-            "diff", lambda doc: diff_manager.diff(
-                "jsondiff-selfcontained", old=None, new=doc["_id"]))
+        diff_manager.poll("diff", partial(diff_pending, diff_manager))
         self.managers["diff_manager"] = diff_manager
 
     def configure_index_manager(self):
@@ -528,7 +764,7 @@ class HubServer(object):
         snapshot_manager = SnapshotManager(
             index_manager=self.managers["index_manager"],
             job_manager=self.managers["job_manager"],
-            poll_schedule="* * * * * */10", **args)
+            poll_schedule=HUB_POLL_SCHEDULE, **args)
         snapshot_manager.configure(config.SNAPSHOT_CONFIG)
         snapshot_manager.poll("snapshot",snapshot_manager.snapshot_build)
         self.managers["snapshot_manager"] = snapshot_manager
@@ -542,7 +778,7 @@ class HubServer(object):
             diff_manager=self.managers["diff_manager"],
             snapshot_manager=self.managers["snapshot_manager"],
             job_manager=self.managers["job_manager"],
-            poll_schedule="* * * * * */10",
+            poll_schedule=HUB_POLL_SCHEDULE,
             **args)
         release_manager.configure(config.RELEASE_CONFIG)
         release_manager.poll("release_note", release_manager.create_release_note_from_build)
@@ -602,9 +838,7 @@ class HubServer(object):
         if "upload" in self.features and not getattr(
                 config, "SKIP_UPLOADER_POLL", False):
             self.managers["upload_manager"].poll(
-                'upload', lambda doc: self.shell.launch(
-                    partial(self.managers["upload_manager"].upload_src, doc[
-                        "_id"])))
+                'upload', partial(upload_pending, self))
 
     def configure_autohub_feature(self):
         """
@@ -698,9 +932,10 @@ class HubServer(object):
 
         # specific order, eg. job_manager is used by all managers
         for feat in self.features:
-            if hasattr(self, "configure_%s_manager" % feat):
+            configure_manager = getattr(self, "configure_%s_manager" % feat, None)
+            if configure_manager:
                 self.logger.info("Configuring feature '%s'", feat)
-                getattr(self, "configure_%s_manager" % feat)()
+                configure_manager()
                 self.remaining_features.remove(feat)
             elif hasattr(self, "configure_%s_feature" % feat):
                 # see configure_remaining_features()
@@ -710,7 +945,7 @@ class HubServer(object):
                     "Feature '%s' listed but no 'configure_%s_{manager|feature}' method found"
                     % (feat, feat))
 
-        self.logger.info("Active manager(s): %s" % pformat(self.managers))
+        self.logger.info("Active manager(s): %s", list(self.managers))
 
     def configure_config_feature(self):
         # just a placeholder
@@ -759,11 +994,10 @@ class HubServer(object):
                     # just in case, we pop out the key
                     getattr(config.conf, param).pop("upgrade", None)
 
-        loop = self.managers.get("job_manager") and self.managers[
-            "job_manager"].loop or asyncio.get_event_loop()
+        loop = self.loop
 
         # check at startup, then regularly
-        asyncio.ensure_future(check_code_upgrade())
+        asyncio.ensure_future(check_code_upgrade(), loop=loop)
         aiocron.crontab(HUB_CHECK_UPGRADE,
                         func=check_code_upgrade,
                         start=True,
@@ -776,7 +1010,6 @@ class HubServer(object):
 
         import sockjs.tornado
         import biothings.hub.api.handlers.ws as ws
-        from biothings.utils.hub_db import ChangeWatcher
         # monitor change in database to report activity in webapp
         self.db_listener = ws.HubDBListener()
         ChangeWatcher.add(self.db_listener)
@@ -856,11 +1089,11 @@ class HubServer(object):
         self.logger.info("Setting up remaining features: %s",
                          self.remaining_features)
         # specific order, eg. job_manager is used by all managers
-        for feat in copy.deepcopy(self.remaining_features):
-            if hasattr(self, "configure_%s_feature" % feat):
-                getattr(self, "configure_%s_feature" % feat)()
+        for feat in list(self.remaining_features):
+            configure_feature = getattr(self, "configure_%s_feature" % feat, None)
+            if configure_feature:
+                configure_feature()
                 self.remaining_features.remove(feat)
-                pass  # this is configured after managers but should not produce an error
             else:
                 raise AttributeError(
                     "Feature '%s' listed but no 'configure_%s_feature' method found"
@@ -872,7 +1105,11 @@ class HubServer(object):
         """
         assert self.managers, "No managers configured"
         self.commands = HubCommands()
-        self.commands["status"] = CommandDefinition(command=partial(status, self.managers),
+        # status is cached until related hub db collections are changed
+        self.status_listener = StatusListener()
+        ChangeWatcher.add(self.status_listener)
+        self.commands["status"] = CommandDefinition(command=partial(status, self.managers,
+                                                                    self.status_listener),
                                                     tracked=False)
         if "config" in self.features:
             self.commands["config"] = CommandDefinition(command=config.show,
@@ -880,33 +1117,31 @@ class HubServer(object):
             self.commands["setconf"] = config.store_value_to_db
             self.commands["resetconf"] = config.reset
         # getting info
-        if self.managers.get("source_manager"):
+        source_manager = self.managers.get("source_manager")
+        if source_manager:
             self.commands["source_info"] = CommandDefinition(
-                command=self.managers["source_manager"].get_source,
-                tracked=False)
+                command=source_manager.get_source, tracked=False)
             self.commands["source_reset"] = CommandDefinition(
-                command=self.managers["source_manager"].reset, tracked=True)
+                command=source_manager.reset, tracked=True)
         # dump commands
-        if self.managers.get("dump_manager"):
-            self.commands["dump"] = self.managers["dump_manager"].dump_src
-            self.commands["dump_all"] = self.managers["dump_manager"].dump_all
+        dump_manager = self.managers.get("dump_manager")
+        if dump_manager:
+            self.commands["dump"] = dump_manager.dump_src
+            self.commands["dump_all"] = dump_manager.dump_all
         # upload commands
-        if self.managers.get("upload_manager"):
-            self.commands["upload"] = self.managers[
-                "upload_manager"].upload_src
-            self.commands["upload_all"] = self.managers[
-                "upload_manager"].upload_all
+        upload_manager = self.managers.get("upload_manager")
+        if upload_manager:
+            self.commands["upload"] = upload_manager.upload_src
+            self.commands["upload_all"] = upload_manager.upload_all
         # building/merging
-        if self.managers.get("build_manager"):
+        build_manager = self.managers.get("build_manager")
+        if build_manager:
             self.commands["whatsnew"] = CommandDefinition(
-                command=self.managers["build_manager"].whatsnew, tracked=False)
-            self.commands["lsmerge"] = self.managers[
-                "build_manager"].list_merge
-            self.commands["rmmerge"] = self.managers[
-                "build_manager"].delete_merge
-            self.commands["merge"] = self.managers["build_manager"].merge
-            self.commands["archive"] = self.managers[
-                "build_manager"].archive_merge
+                command=build_manager.whatsnew, tracked=False)
+            self.commands["lsmerge"] = build_manager.list_merge
+            self.commands["rmmerge"] = build_manager.delete_merge
+            self.commands["merge"] = build_manager.merge
+            self.commands["archive"] = build_manager.archive_merge
         if hasattr(config, "INDEX_CONFIG"):
             self.commands["index_config"] = config.INDEX_CONFIG
         if hasattr(config, "SNAPSHOT_CONFIG"):
@@ -914,44 +1149,42 @@ class HubServer(object):
         if hasattr(config, "PUBLISH_CONFIG"):
             self.commands["publish_config"] = config.PUBLISH_CONFIG
         # diff
-        if self.managers.get("diff_manager"):
-            self.commands["diff"] = self.managers["diff_manager"].diff
-            self.commands["report"] = self.managers["diff_manager"].diff_report
+        diff_manager = self.managers.get("diff_manager")
+        if diff_manager:
+            self.commands["diff"] = diff_manager.diff
+            self.commands["report"] = diff_manager.diff_report
         # indexing commands
-        if self.managers.get("index_manager"):
-            self.commands["index"] = self.managers["index_manager"].index
-        if self.managers.get("snapshot_manager"):
-            self.commands["snapshot"] = self.managers[
-                "snapshot_manager"].snapshot
+        index_manager = self.managers.get("index_manager")
+        if index_manager:
+            self.commands["index"] = index_manager.index
+        snapshot_manager = self.managers.get("snapshot_manager")
+        if snapshot_manager:
+            self.commands["snapshot"] = snapshot_manager.snapshot
         # data release commands
-        if self.managers.get("release_manager"):
-            self.commands["create_release_note"] = self.managers[
-                "release_manager"].create_release_note
+        release_manager = self.managers.get("release_manager")
+        if release_manager:
+            self.commands["create_release_note"] = release_manager.create_release_note
             self.commands["get_release_note"] = CommandDefinition(
-                command=self.managers["release_manager"].get_release_note,
-                tracked=False)
-            self.commands["publish"] = self.managers["release_manager"].publish
-            self.commands["publish_diff"] = self.managers[
-                "release_manager"].publish_diff
-            self.commands["publish_snapshot"] = self.managers[
-                "release_manager"].publish_snapshot
-        if self.managers.get("sync_manager"):
-            self.commands["sync"] = CommandDefinition(
-                command=self.managers["sync_manager"].sync)
+                command=release_manager.get_release_note, tracked=False)
+            self.commands["publish"] = release_manager.publish
+            self.commands["publish_diff"] = release_manager.publish_diff
+            self.commands["publish_snapshot"] = release_manager.publish_snapshot
+        sync_manager = self.managers.get("sync_manager")
+        if sync_manager:
+            self.commands["sync"] = CommandDefinition(command=sync_manager.sync)
         # inspector
-        if self.managers.get("inspect_manager"):
-            self.commands["inspect"] = self.managers["inspect_manager"].inspect
+        inspect_manager = self.managers.get("inspect_manager")
+        if inspect_manager:
+            self.commands["inspect"] = inspect_manager.inspect
         # data plugins
-        if self.managers.get("assistant_manager"):
-            self.commands["register_url"] = partial(
-                self.managers["assistant_manager"].register_url)
-            self.commands["unregister_url"] = partial(
-                self.managers["assistant_manager"].unregister_url)
-            self.commands["export_plugin"] = partial(
-                self.managers["assistant_manager"].export)
-        if self.managers.get("dataplugin_manager"):
-            self.commands["dump_plugin"] = self.managers[
-                "dataplugin_manager"].dump_src
+        assistant_manager = self.managers.get("assistant_manager")
+        if assistant_manager:
+            self.commands["register_url"] = partial(assistant_manager.register_url)
+            self.commands["unregister_url"] = partial(assistant_manager.unregister_url)
+            self.commands["export_plugin"] = partial(assistant_manager.export)
+        dataplugin_manager = self.managers.get("dataplugin_manager")
+        if dataplugin_manager:
+            self.commands["dump_plugin"] = dataplugin_manager.dump_src
         if "autohub" in self.DEFAULT_FEATURES:
             self.commands["list"] = CommandDefinition(command=self.autohub_feature.list_biothings, tracked=False)
             # dump commands
@@ -974,8 +1207,7 @@ class HubServer(object):
         """
         assert self.managers, "No managers configured"
         self.extra_commands = {}  # unordered since not exposed, we don't care
-        loop = self.managers.get("job_manager") and self.managers[
-            "job_manager"].loop or asyncio.get_event_loop()
+        loop = self.loop
         self.extra_commands["g"] = CommandDefinition(command=globals(),
                                                      tracked=False)
         self.extra_commands["sch"] = CommandDefinition(command=partial(get_schedule, loop),
@@ -986,119 +1218,22 @@ class HubServer(object):
         self.extra_commands["loop"] = CommandDefinition(command=loop,
                                                         tracked=False)
 
-        if self.managers.get("job_manager"):
-            self.extra_commands["pqueue"] = CommandDefinition(
-                command=self.managers["job_manager"].process_queue,
-                tracked=False)
-            self.extra_commands["tqueue"] = CommandDefinition(
-                command=self.managers["job_manager"].thread_queue,
-                tracked=False)
-            self.extra_commands["jm"] = CommandDefinition(
-                command=self.managers["job_manager"], tracked=False)
-            self.extra_commands["top"] = CommandDefinition(
-                command=self.managers["job_manager"].top, tracked=False)
-            self.extra_commands["job_info"] = CommandDefinition(
-                command=self.managers["job_manager"].job_info, tracked=False)
-            self.extra_commands["schedule"] = CommandDefinition(
-                command=self.managers["job_manager"].schedule, tracked=False)
-        if self.managers.get("source_manager"):
-            self.extra_commands["sm"] = CommandDefinition(
-                command=self.managers["source_manager"], tracked=False)
-            self.extra_commands["sources"] = CommandDefinition(
-                command=self.managers["source_manager"].get_sources,
-                tracked=False)
-            self.extra_commands["source_save_mapping"] = CommandDefinition(
-                command=self.managers["source_manager"].save_mapping)
-        if self.managers.get("dump_manager"):
-            self.extra_commands["dm"] = CommandDefinition(
-                command=self.managers["dump_manager"], tracked=False)
-            self.extra_commands["dump_info"] = CommandDefinition(
-                command=self.managers["dump_manager"].dump_info, tracked=False)
-        if self.managers.get("dataplugin_manager"):
-            self.extra_commands["dpm"] = CommandDefinition(
-                command=self.managers["dataplugin_manager"], tracked=False)
-        if self.managers.get("assistant_manager"):
-            self.extra_commands["am"] = CommandDefinition(
-                command=self.managers["assistant_manager"], tracked=False)
-        if self.managers.get("upload_manager"):
-            self.extra_commands["um"] = CommandDefinition(
-                command=self.managers["upload_manager"], tracked=False)
-            self.extra_commands["upload_info"] = CommandDefinition(
-                command=self.managers["upload_manager"].upload_info,
-                tracked=False)
-        if self.managers.get("build_manager"):
-            self.extra_commands["bm"] = CommandDefinition(
-                command=self.managers["build_manager"], tracked=False)
-            self.extra_commands["builds"] = CommandDefinition(
-                command=self.managers["build_manager"].build_info,
-                tracked=False)
+        for mgr_name, entries in self.DEFAULT_EXTRA_COMMANDS:
+            mgr = self.managers.get(mgr_name)
+            if not mgr:
+                continue
+            for name, attr, tracked in entries:
+                self.extra_commands[name] = CommandDefinition(
+                    command=mgr if attr is None else getattr(mgr, attr),
+                    tracked=tracked)
+        build_manager = self.managers.get("build_manager")
+        if build_manager:
             self.extra_commands["build"] = CommandDefinition(
-                command=lambda id: self.managers["build_manager"].build_info(
-                    id=id),
-                tracked=False)
-            self.extra_commands["build_config_info"] = CommandDefinition(
-                command=self.managers["build_manager"].build_config_info,
+                command=lambda id: build_manager.build_info(id=id),
                 tracked=False)
-            self.extra_commands["build_save_mapping"] = CommandDefinition(
-                command=self.managers["build_manager"].save_mapping)
-            self.extra_commands["create_build_conf"] = CommandDefinition(
-                command=self.managers["build_manager"].
-                create_build_configuration)
-            self.extra_commands["update_build_conf"] = CommandDefinition(
-                command=self.managers["build_manager"].
-                update_build_configuration)
-            self.extra_commands["delete_build_conf"] = CommandDefinition(
-                command=self.managers["build_manager"].
-                delete_build_configuration)
         if self.managers.get("diff_manager"):
-            self.extra_commands["dim"] = CommandDefinition(
-                command=self.managers["diff_manager"], tracked=False)
-            self.extra_commands["diff_info"] = CommandDefinition(
-                command=self.managers["diff_manager"].diff_info, tracked=False)
             self.extra_commands["jsondiff"] = CommandDefinition(
                 command=jsondiff, tracked=False)
-        if self.managers.get("sync_manager"):
-            self.extra_commands["sym"] = CommandDefinition(
-                command=self.managers["sync_manager"], tracked=False)
-        if self.managers.get("index_manager"):
-            self.extra_commands["im"] = CommandDefinition(
-                command=self.managers["index_manager"], tracked=False)
-            self.extra_commands["index_info"] = CommandDefinition(
-                command=self.managers["index_manager"].index_info,
-                tracked=False)
-            self.extra_commands["validate_mapping"] = CommandDefinition(
-                command=self.managers["index_manager"].validate_mapping)
-        if self.managers.get("snapshot_manager"):
-            self.extra_commands["ssm"] = CommandDefinition(
-                command=self.managers["snapshot_manager"], tracked=False)
-            self.extra_commands["snapshot_info"] = CommandDefinition(
-                command=self.managers["snapshot_manager"].snapshot_info,
-                tracked=False)
-        if self.managers.get("release_manager"):
-            self.extra_commands["rm"] = CommandDefinition(
-                command=self.managers["release_manager"], tracked=False)
-            self.extra_commands["release_info"] = CommandDefinition(
-                command=self.managers["release_manager"].release_info,
-                tracked=False)
-            self.extra_commands["reset_synced"] = CommandDefinition(
-                command=self.managers["release_manager"].reset_synced,
-                tracked=True)
-        if self.managers.get("inspect_manager"):
-            self.extra_commands["ism"] = CommandDefinition(
-                command=self.managers["inspect_manager"], tracked=False)
-        if self.managers.get("api_manager"):
-            self.extra_commands["api"] = CommandDefinition(
-                command=self.managers["api_manager"], tracked=False)
-            self.extra_commands["get_apis"] = CommandDefinition(
-                command=self.managers["api_manager"].get_apis, tracked=False)
-            self.extra_commands["delete_api"] = CommandDefinition(
-                command=self.managers["api_manager"].delete_api)
-            self.extra_commands["create_api"] = CommandDefinition(
-                command=self.managers["api_manager"].create_api)
-            self.extra_commands["start_api"] = CommandDefinition(
-                command=self.managers["api_manager"].start_api)
-            self.extra_commands["stop_api"] = self.managers[
-                "api_manager"].stop_api
         if "upgrade" in self.DEFAULT_FEATURES:
             def upgrade(code_base):  # just a wrapper over dumper
                 """Upgrade (git pull) repository for given code base name ("biothings_sdk" or "application")"""
@@ -1119,271 +1254,41 @@ class HubServer(object):
         """
         if self.configured:
             raise Exception("API endpoint creation must be done before Hub is configured")
-        from biothings.hub.api import EndpointDefinition
         endpoint = EndpointDefinition(name=command_name,method=method,**kwargs)
         self.api_endpoints[endpoint_name] = endpoint
 
     def configure_api_endpoints(self):
-        cmdnames = list(self.commands.keys())
+        # set, as lots of membership tests follow
+        cmdnames = set(self.commands)
         if self.extra_commands:
-            cmdnames.extend(list(self.extra_commands.keys()))
-        from biothings.hub.api import EndpointDefinition
-        self.api_endpoints["config"] = []
-        if "config" in cmdnames:
-            self.api_endpoints["config"].append(
-                EndpointDefinition(name="config", method="get"))
-            self.api_endpoints["config"].append(
-                EndpointDefinition(name="setconf",
-                                   method="put",
-                                   force_bodyargs=True))
-            self.api_endpoints["config"].append(
-                EndpointDefinition(name="resetconf",
-                                   method="delete",
-                                   force_bodyargs=True))
-        if not self.api_endpoints["config"]:
-            self.api_endpoints.pop("config")
-        if "builds" in cmdnames:
-            self.api_endpoints["builds"] = EndpointDefinition(name="builds",
-                                                              method="get")
-        self.api_endpoints["build"] = []
-        if "build" in cmdnames:
-            self.api_endpoints["build"].append(
-                EndpointDefinition(method="get", name="build"))
-        if "archive" in cmdnames:
-            self.api_endpoints["build"].append(
-                EndpointDefinition(method="post",
-                                   name="archive",
-                                   suffix="archive"))
-        if "rmmerge" in cmdnames:
-            self.api_endpoints["build"].append(
-                EndpointDefinition(method="delete", name="rmmerge"))
-        if "merge" in cmdnames:
-            self.api_endpoints["build"].append(
-                EndpointDefinition(name="merge", method="put", suffix="new"))
-        if "build_save_mapping" in cmdnames:
-            self.api_endpoints["build"].append(
-                EndpointDefinition(name="build_save_mapping",
-                                   method="put",
-                                   suffix="mapping"))
-        if not self.api_endpoints["build"]:
-            self.api_endpoints.pop("build")
-        self.api_endpoints["publish"] = []
-        if "publish_diff" in cmdnames:
-            self.api_endpoints["publish"].append(
-                EndpointDefinition(name="publish_diff",
-                                   method="post",
-                                   suffix="incremental",
-                                   force_bodyargs=True))
-        if "publish_snapshot" in cmdnames:
-            self.api_endpoints["publish"].append(
-                EndpointDefinition(name="publish_snapshot",
-                                   method="post",
-                                   suffix="full",
-                                   force_bodyargs=True))
-        if not self.api_endpoints["publish"]:
-            self.api_endpoints.pop("publish")
-        if "diff" in cmdnames:
-            self.api_endpoints["diff"] = EndpointDefinition(
-                name="diff", method="put", force_bodyargs=True)
-        if "job_info" in cmdnames:
-            self.api_endpoints["job_manager"] = EndpointDefinition(
-                name="job_info", method="get")
-        if "dump_info" in cmdnames:
-            self.api_endpoints["dump_manager"] = EndpointDefinition(
-                name="dump_info", method="get")
-        if "upload_info" in cmdnames:
-            self.api_endpoints["upload_manager"] = EndpointDefinition(
-                name="upload_info", method="get")
-        if "build_config_info" in cmdnames:
-            self.api_endpoints["build_manager"] = EndpointDefinition(
-                name="build_config_info", method="get")
-        if "index_info" in cmdnames:
-            self.api_endpoints["index_manager"] = EndpointDefinition(
-                name="index_info", method="get")
-        if "snapshot_info" in cmdnames:
-            self.api_endpoints["snapshot_manager"] = EndpointDefinition(
-                name="snapshot_info", method="get")
-        if "release_info" in cmdnames:
-            self.api_endpoints["release_manager"] = EndpointDefinition(
-                name="release_info", method="get")
-        if "reset_synced" in cmdnames:
-            self.api_endpoints[
-                "release_manager/reset_synced"] = EndpointDefinition(
-                    name="reset_synced", method="put")
-        if "diff_info" in cmdnames:
-            self.api_endpoints["diff_manager"] = EndpointDefinition(
-                name="diff_info", method="get")
-        if "commands" in cmdnames:
-            self.api_endpoints["commands"] = EndpointDefinition(
-                name="commands", method="get")
-        if "command" in cmdnames:
-            self.api_endpoints["command"] = EndpointDefinition(name="command",
-                                                               method="get")
-        if "sources" in cmdnames:
-            self.api_endpoints["sources"] = EndpointDefinition(name="sources",
-                                                               method="get")
-        self.api_endpoints["source"] = []
-        if "source_info" in cmdnames:
-            self.api_endpoints["source"].append(
-                EndpointDefinition(name="source_info", method="get"))
-        if "source_reset" in cmdnames:
-            self.api_endpoints["source"].append(
-                EndpointDefinition(name="source_reset",
-                                   method="post",
-                                   suffix="reset"))
-        if "dump" in cmdnames:
-            self.api_endpoints["source"].append(
-                EndpointDefinition(name="dump", method="put", suffix="dump"))
-        if "upload" in cmdnames:
-            self.api_endpoints["source"].append(
-                EndpointDefinition(name="upload",
-                                   method="put",
-                                   suffix="upload"))
-        if "source_save_mapping" in cmdnames:
-            self.api_endpoints["source"].append(
-                EndpointDefinition(name="source_save_mapping",
-                                   method="put",
-                                   suffix="mapping"))
-        if not self.api_endpoints["source"]:
-            self.api_endpoints.pop("source")
-        if "inspect" in cmdnames:
-            self.api_endpoints["inspect"] = EndpointDefinition(
-                name="inspect", method="put", force_bodyargs=True)
-        if "register_url" in cmdnames:
-            self.api_endpoints["dataplugin/register_url"] = EndpointDefinition(
-                name="register_url", method="post", force_bodyargs=True)
-        if "unregister_url" in cmdnames:
-            self.api_endpoints[
-                "dataplugin/unregister_url"] = EndpointDefinition(
-                    name="unregister_url",
-                    method="delete",
-                    force_bodyargs=True)
-        self.api_endpoints["dataplugin"] = []
-        if "dump_plugin" in cmdnames:
-            self.api_endpoints["dataplugin"].append(
-                EndpointDefinition(name="dump_plugin",
-                                   method="put",
-                                   suffix="dump"))
-        if "export_plugin" in cmdnames:
-            self.api_endpoints["dataplugin"].append(
-                EndpointDefinition(name="export_plugin",
-                                   method="put",
-                                   suffix="export"))
-        if not self.api_endpoints["dataplugin"]:
-            self.api_endpoints.pop("dataplugin")
-        if "jsondiff" in cmdnames:
-            self.api_endpoints["jsondiff"] = EndpointDefinition(
-                name="jsondiff", method="post", force_bodyargs=True)
-        if "validate_mapping" in cmdnames:
-            self.api_endpoints["mapping/validate"] = EndpointDefinition(
-                name="validate_mapping", method="post", force_bodyargs=True)
-        self.api_endpoints["buildconf"] = []
-        if "create_build_conf" in cmdnames:
-            self.api_endpoints["buildconf"].append(
-                EndpointDefinition(name="create_build_conf",
-                                   method="post",
-                                   force_bodyargs=True))
-            self.api_endpoints["buildconf"].append(
-                EndpointDefinition(name="update_build_conf",
-                                   method="put",
-                                   force_bodyargs=True))
-        if "delete_build_conf" in cmdnames:
-            self.api_endpoints["buildconf"].append(
-                EndpointDefinition(name="delete_build_conf",
-                                   method="delete",
-                                   force_bodyargs=True))
-        if not self.api_endpoints["buildconf"]:
-            self.api_endpoints.pop("buildconf")
-        if "index" in cmdnames:
-            self.api_endpoints["index"] = EndpointDefinition(
-                name="index", method="put", force_bodyargs=True)
-        if "snapshot" in cmdnames:
-            self.api_endpoints["snapshot"] = EndpointDefinition(
-                name="snapshot", method="put", force_bodyargs=True)
-        if "sync" in cmdnames:
-            self.api_endpoints["sync"] = EndpointDefinition(
-                name="sync", method="post", force_bodyargs=True)
-        if "whatsnew" in cmdnames:
-            self.api_endpoints["whatsnew"] = EndpointDefinition(
-                name="whatsnew", method="get")
-        if "status" in cmdnames:
-            self.api_endpoints["status"] = EndpointDefinition(name="status",
-                                                              method="get")
-        self.api_endpoints["release_note"] = []
-        if "create_release_note" in cmdnames:
-            self.api_endpoints["release_note"].append(
-                EndpointDefinition(name="create_release_note",
-                                   method="put",
-                                   suffix="create",
-                                   force_bodyargs=True))
-        if "get_release_note" in cmdnames:
-            self.api_endpoints["release_note"].append(
-                EndpointDefinition(name="get_release_note",
-                                   method="get",
-                                   force_bodyargs=True))
-        if not self.api_endpoints["release_note"]:
-            self.api_endpoints.pop("release_note")
-        self.api_endpoints["api"] = []
-        if "start_api" in cmdnames:
-            self.api_endpoints["api"].append(
-                EndpointDefinition(name="start_api",
-                                   method="put",
-                                   suffix="start"))
-        if "stop_api" in cmdnames:
-            self.api_endpoints["api"].append(
-                EndpointDefinition(name="stop_api",
-                                   method="put",
-                                   suffix="stop"))
-        if "delete_api" in cmdnames:
-            self.api_endpoints["api"].append(
-                EndpointDefinition(name="delete_api",
-                                   method="delete",
-                                   force_bodyargs=True))
-        if "create_api" in cmdnames:
-            self.api_endpoints["api"].append(
-                EndpointDefinition(name="create_api",
-                                   method="post",
-                                   force_bodyargs=True))
-        if not self.api_endpoints["api"]:
-            self.api_endpoints.pop("api")
-        if "get_apis" in cmdnames:
-            self.api_endpoints["api/list"] = EndpointDefinition(
-                name="get_apis", method="get")
-        if "stop" in cmdnames:
-            self.api_endpoints["stop"] = EndpointDefinition(name="stop",
-                                                            method="put")
-        if "restart" in cmdnames:
-            self.api_endpoints["restart"] = EndpointDefinition(name="restart",
-                                                               method="put")
-        self.api_endpoints["standalone"] = []
-        if "list" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="list", method="get", suffix="list"))
-        if "versions" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="versions", method="get", suffix="versions"))
-        if "check" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="check", method="get", suffix="check"))
-        if "info" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="info", method="get", suffix="info"))
-        if "download" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="download", method="post", suffix="download"))
-        if "apply" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="apply", method="post", suffix="apply"))
-        if "install" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="install", method="post", suffix="install"))
-        if "backend" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="backend", method="get", suffix="backend"))
-        if "reset_backend" in cmdnames:
-            self.api_endpoints["standalone"].append(EndpointDefinition(name="reset_backend", method="delete", suffix="backend"))
-        if not self.api_endpoints["standalone"]:
-            self.api_endpoints.pop("standalone")
+            cmdnames.update(self.extra_commands)
+        endpoints = self.api_endpoints
+        grouped = {}
+        for cmd, path, args, is_list in self.DEFAULT_API_ENDPOINTS:
+            if cmd not in cmdnames:
+                continue
+            if is_list:
+                if path not in grouped:
+                    grouped[path] = endpoints[path] = []
+                grouped[path].append(EndpointDefinition(**args))
+            else:
+                endpoints[path] = EndpointDefinition(**args)
         if "upgrade" in self.commands:
-            self.api_endpoints["code/upgrade"] = EndpointDefinition(name="upgrade", method="put")
+            endpoints["code/upgrade"] = EndpointDefinition(name="upgrade", method="put")
 
 
 class HubSSHServer(asyncssh.SSHServer):
 
     PASSWORDS = {}
     SHELL = None
+    # parsed authorized keys per username, as (file mtime, keys)
+    AUTHORIZED_KEYS = {}
+    # recently validated credentials, as (username, stored hash, keyed digest of password),
+    # so reconnecting clients don't pay for crypt() each time. Plain passwords are never kept,
+    # the digest key is random and only lives in this process
+    VERIFIED_PASSWORDS = OrderedDict()
+    VERIFIED_PASSWORDS_MAXSIZE = 64
+    _digest_key = os.urandom(32)
 
     def session_requested(self):
         return HubSSHServerSession(self.__class__.NAME, self.__class__.SHELL)
@@ -1400,9 +1305,17 @@ class HubSSHServer(asyncssh.SSHServer):
             print('SSH connection closed.')
 
     def begin_auth(self, username):
+        path = 'bin/authorized_keys/%s.pub' % username
         try:
-            self._conn.set_authorized_keys('bin/authorized_keys/%s.pub' %
-                                           username)
+            mtime = os.stat(path).st_mtime
+            cached = self.AUTHORIZED_KEYS.get(username)
+            if cached and cached[0] == mtime:
+                keys = cached[1]
+            else:
+                # (re)parse only if file is new or was modified
+                keys = asyncssh.read_authorized_keys(path)
+                self.AUTHORIZED_KEYS[username] = (mtime, keys)
+            self._conn.set_authorized_keys(keys)
         except IOError:
             pass
         return True
@@ -1411,11 +1324,23 @@ class HubSSHServer(asyncssh.SSHServer):
         return True
 
     def validate_password(self, username, password):
-        if self.password_auth_supported():
-            pw = self.__class__.PASSWORDS.get(username, '*')
-            return crypt.crypt(password, pw) == pw
-        else:
-            return False
+        # only called when password_auth_supported() is True
+        pw = self.PASSWORDS.get(username, '*')
+        digest = hmac.new(self._digest_key, password.encode(), hashlib.sha256).digest()
+        verified = self.VERIFIED_PASSWORDS
+        key = (username, pw, digest)
+        if key in verified:
+            verified.move_to_end(key)
+            return True
+        hashed = crypt.crypt(password, pw)
+        # constant time comparison, doesn't tell how much of the hash matched
+        valid = hashed is not None and hmac.compare_digest(hashed.encode(), pw.encode())
+        if valid:
+            # only successful ones, failed attempts always go through crypt()
+            verified[key] = True
+            if len(verified) > self.VERIFIED_PASSWORDS_MAXSIZE:
+                verified.popitem(last=False)
+        return valid
 
 
 class HubSSHServerSession(asyncssh.SSHServerSession):
@@ -1444,25 +1369,32 @@ class HubSSHServerSession(asyncssh.SSHServerSession):
         self._chan.write(prompt)
 
     def data_received(self, data, datatype):
-        self._input += data
-        return self.eval_lines(self._input.split('\n'))
+        if '\n' not in data:
+            # no complete line yet, keep it for later
+            self._input += data
+            return
+        lines = (self._input + data).split('\n')
+        # consume complete lines, keep what's left after last one
+        self._input = lines[-1]
+        return self.eval_lines(lines)
 
     def eval_lines(self, lines):
+        # outputs and prompt are sent to the channel in one write
+        parts = []
         for line in lines[:-1]:
             try:
-                outs = [out for out in self.shell.eval(line) if out]
-                # trailing \n if not already there
-                if outs:
-                    strout = "\n".join(outs).strip("\n") + "\n"
-                    self._chan.write(strout)
+                strout = "\n".join(filter(None, self.shell.eval(line))).strip("\n")
+                if strout:
+                    # single trailing \n
+                    strout += "\n"
+                    parts.append(strout)
                     self.shell.shellog.output(strout)
             except AlreadyRunningException as e:
-                self._chan.write("AlreadyRunningException: %s" % e)
+                parts.append("AlreadyRunningException: %s" % e)
             except CommandError as e:
-                self._chan.write("CommandError: %s" % e)
-        self._chan.write('hub> ')
-        # consume passed commands
-        self._input = lines[-1]
+                parts.append("CommandError: %s" % e)
+        parts.append('hub> ')
+        self._chan.write("".join(parts))
 
     def eof_received(self):
         self._chan.write('Have a good one...\n')
@@ -1,5 +1,6 @@
 import asyncio
 from tornado.web import RequestHandler
+from tornado.escape import json_encode
 import logging
 import datetime
 import pandas.io.json as pdjson
@@ -8,22 +9,25 @@ from biothings import config
 
 
 class DefaultHandler(RequestHandler):
-    def set_default_headers(self):
-        self.set_header('Access-Control-Allow-Origin', '*')
-        self.set_header('Content-Type', 'application/json')
+
+    DEFAULT_HEADERS = (
+        ('Access-Control-Allow-Origin', '*'),
+        ('Content-Type', 'application/json'),
         # part of pre-flight requests
-        self.set_header('Access-Control-Allow-Methods',
-                        'PUT, DELETE, POST, GET, OPTIONS')
-        self.set_header(
-            'Access-Control-Allow-Headers',
-            'Content-Type,X-BioThings-API,X-Biothings-Access-Token')
+        ('Access-Control-Allow-Methods', 'PUT, DELETE, POST, GET, OPTIONS'),
+        ('Access-Control-Allow-Headers',
+         'Content-Type,X-BioThings-API,X-Biothings-Access-Token'),
+    )
+
+    def set_default_headers(self):
+        set_header = self.set_header
+        for name, value in self.DEFAULT_HEADERS:
+            set_header(name, value)
 
     def write(self, result):
+        # only result needs to be serialized, envelope is constant
         super(DefaultHandler, self).write(
-            pdjson.dumps({
-                "result": result,
-                "status": "ok"
-            }, iso_dates=True))
+            '{"result":%s,"status":"ok"}' % pdjson.dumps(result, iso_dates=True))
 
     def write_error(self, status_code, **kwargs):
         self.set_status(status_code)
@@ -50,26 +54,23 @@ class GenericHandler(DefaultHandler):
     def initialize(self, shell, **kwargs):
         self.shell = shell
 
-    def get(self, *args, **kwargs):
-        logging.debug("GET args: %s, kwargs: %s" % (args, kwargs))
-        self.write_error(405, exc_info=(None, "Method GET not allowed", None))
-
-    def post(self, *args, **kwargs):
-        logging.debug("POST args: %s, kwargs: %s" % (args, kwargs))
-        self.write_error(405, exc_info=(None, "Method POST not allowed", None))
-
-    def put(self, *args, **kwargs):
-        logging.debug("PUT args: %s, kwargs: %s" % (args, kwargs))
-        self.write_error(405, exc_info=(None, "Method PUT not allowed", None))
-
-    def delete(self, *args, **kwargs):
-        logging.debug("DELETE args: %s, kwargs: %s" % (args, kwargs))
-        self.write_error(405,
-                         exc_info=(None, "Method DELETE not allowed", None))
-
-    def head(self, *args, **kwargs):
-        logging.debug("HEAD args: %s, kwargs: %s" % (args, kwargs))
-        self.write_error(405, exc_info=(None, "Method HEAD not allowed", None))
+    # same body as write_error(405, ...) would produce, serialized once per method
+    NOT_ALLOWED_BODIES = {
+        method: json_encode({
+            "error": "Method %s not allowed" % method,
+            "status": "error",
+            "code": 405
+        }) for method in ("GET", "POST", "PUT", "DELETE", "HEAD")
+    }
+
+    def method_not_allowed(self, *args, **kwargs):
+        """Default for any HTTP method, generated handlers override the ones they expose"""
+        method = self.request.method
+        logging.debug("%s args: %s, kwargs: %s" % (method, args, kwargs))
+        self.set_status(405)
+        super(DefaultHandler, self).write(self.NOT_ALLOWED_BODIES[method])
+
+    get = post = put = delete = head = method_not_allowed
 
 
 class RootHandler(DefaultHandler):
@@ -1,6 +1,7 @@
-import logging
 import asyncio
+import collections
 import json
+import threading
 
 from biothings.utils.hub_db import ChangeListener
 
@@ -79,31 +80,59 @@ class HubDBListener(ChangeListener):
 
 
 class LogListener(ChangeListener):
+    """
+    Propagate log records through the websocket instance. Records can come
+    from any thread, they're buffered and published from the hub's loop,
+    at most every 'flush_interval' seconds, as one message (list of up to
+    'flush_size' records) per flush
+    """
     # IMPORTANT: no logging calls here, or infinite loop
+
+    flush_interval = 0.1
+    flush_size = 100
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.socket = None
+        # listener is created from the hub's loop thread
+        self.loop = asyncio.get_event_loop()
+        self.events = collections.deque()
+        self.lock = threading.Lock()
+        self.flush_scheduled = False
 
     def read(self, event):
         if self.socket:
-            # make sure there's a loop in current thread
-            try:
-                logging.disable(logging.CRITICAL)
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            finally:
-                logging.disable(logging.NOTSET)
-
+            self.events.append(event)
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        with self.lock:
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self.loop.call_later, self.flush_interval, self.flush)
+        except RuntimeError as e:
+            # loop closed (shutting down). Can't log anything there
+            print(e)
+
+    def flush(self):
+        with self.lock:
+            self.flush_scheduled = False
+        batch = []
+        while self.events and len(batch) < self.flush_size:
+            batch.append(self.events.popleft())
+        if batch:
             try:
-                self.socket.publish(event)
+                self.socket.publish(batch)
             except Exception as e:
                 # can't log anything there, but we don't want a problem with
                 # issuing the log statements through the websocket to cause
                 # any error in the caller
                 print(e)
-                pass
+        # records left (or appended since), next batch on next flush
+        if self.events:
+            self.schedule_flush()
 
 
 class ShellListener(LogListener):
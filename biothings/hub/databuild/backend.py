@@ -142,11 +142,12 @@ class SourceDocMongoBackend(SourceDocBackendBase):
             for src in self.sources_accessed:
                 fullname = get_source_fullname(src)
                 main_name = fullname.split(".")[0]
-                doc = self.dump.find_one({"_id": main_name})
+                doc = self.dump.find_one({"_id": main_name}, projection={"_id": 1})
                 srcs.append(doc["_id"])
             srcs = list(set(srcs))
         else:
-            srcs = [d["_id"] for d in self.dump.find()]
+            # only _ids needed there, don't fetch whole src_dump documents
+            srcs = [d["_id"] for d in self.dump.find({}, projection={"_id": 1})]
         # we need to return main_source named, but if accessed, it's been through sub-source names
         # query is different in that case
         for src in self.dump.find({"_id": {"$in": srcs}}):
@@ -1,7 +1,6 @@
 import asyncio
 import copy
 import json
-import math
 import os
 import pickle
 import re
@@ -120,6 +119,10 @@ class DataBuilder(object):
             "source_backend": None,
             "target_backend": None,
             "build_config": None,
+            # invariant during a merge, (re)computed once per merge() call
+            "root_sources": None,
+            "src_collections": None,
+            "mapper_patterns": None,
         }
 
     @property
@@ -158,14 +161,9 @@ class DataBuilder(object):
     def build_config(self, value):
         self._state["build_config"] = value
 
-    def prepare(self, state={}):
+    def prepare(self):
         if self.prepared:
             return
-        if state:
-            # let's be explicit, _state takes what it wants
-            for k in self._state:
-                self._state[k] = state[k]
-            return
         if self._partial_source_backend:
             self._state["source_backend"] = self._partial_source_backend()
         if self._partial_target_backend:
@@ -174,24 +172,23 @@ class DataBuilder(object):
         self.setup_log()
         self.prepared = True
 
-    def unprepare(self):
-        """
-        reset anything that's not pickable (so self can be pickled)
-        return what's been reset as a dict, so self can be restored
-        once pickled
-        """
-        # TODO: use copy ?
-        state = {
-            "logger": self._state["logger"],
-            "source_backend": self._state["source_backend"],
-            "target_backend": self._state["target_backend"],
-            "build_config": self._state["build_config"],
-        }
-        for k in state:
-            self._state[k] = None
-        self.prepared = False
+    def __getstate__(self):
+        # logger, backends (db connections), cached values and mappers (which can
+        # hold loaded mapping data) aren't pickled. Everything in _state is
+        # re-created on demand once unpickled (see prepare()), mappers aren't:
+        # processes merging data get the mapper they need as an argument
+        state = self.__dict__.copy()
+        for k in ("_state", "logfile", "mappers"):
+            state.pop(k, None)
+        state["prepared"] = False
         return state
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.init_state()
+        self.logfile = None
+        self.mappers = {}
+
     def get_predicates(self):
         """
         Return a list of predicates (functions returning true/false, as in math logic)
@@ -230,7 +227,8 @@ class DataBuilder(object):
         return pinfo
 
     def setup_log(self):
-        self.logger, _ = get_logger('build_%s' % self.build_name)
+        # builder logs a lot during merges, don't block the loop on file I/O
+        self.logger, _ = get_logger('build_%s' % self.build_name, queued=True)
 
     def check_ready(self, force=False):
         if force:
@@ -239,13 +237,17 @@ class DataBuilder(object):
         src_build_config = self.source_backend.build_config
         src_dump = self.source_backend.dump
         _cfg = src_build_config.find_one({'_id': self.build_config['name']})
+        # sub-sources share the same src_dump document, fetch it once per main source
+        src_docs = {}
         # check if all resources are uploaded
         for src_name in _cfg["sources"]:
             fullname = get_source_fullname(src_name)
             if not fullname:
                 raise ResourceNotReady("Can't find source '%s'" % src_name)
             main_name = fullname.split(".")[0]
-            src_doc = src_dump.find_one({"_id": main_name})
+            if main_name not in src_docs:
+                src_docs[main_name] = src_dump.find_one({"_id": main_name})
+            src_doc = src_docs[main_name]
             if not src_doc:
                 raise ResourceNotReady(
                     "Missing information for source '%s' to start merging" %
@@ -321,51 +323,66 @@ class DataBuilder(object):
             build_info["started_at"] = datetime.fromtimestamp(self.t0).astimezone()
             build_info["jobs"] = []
             src_build.insert_one(build_info)
+            build = build_info.copy()
         if init:
             # init timer for this step
             self.ti = time.time()
-            src_build.update({'_id': target_name},
-                             {"$push": {
-                                 'jobs': job_info
-                             }})
-            # now refresh/sync
-            build = src_build.find_one({'_id': target_name})
+            src_build.update_one({'_id': target_name},
+                                 {"$push": {
+                                     'jobs': job_info
+                                 }})
         else:
             # merge extra at root level
             # (to keep building data...) and update the last one
             # (it's been properly created before when init=True)
-            build["jobs"] and build["jobs"][-1].update(job_info)
+            upd = {}
+            if build["jobs"]:
+                build["jobs"][-1].update(job_info)
+                # jobs list is small, the big parts (mapping, _meta, ...) are in build_info
+                upd["jobs"] = build["jobs"]
+
+            def clean_build_info(d):
+                # merge d with "nothing" just to make sure to remove any "__REPLACE__"
+                d.pop("__REPLACE__", None)
+                for k, v in d.items():
+                    if type(v) == dict:
+                        d[k] = clean_build_info(v)
+                return d
 
             # build_info is common to all jobs, so we want to keep
-            # any existing data (well... except if it's explicitely specified)
-            def merge_build_info(target, d):
-                if "__REPLACE__" in d.keys():
-                    d.pop("__REPLACE__")
-                    target = d
-                else:
-                    for k, v in d.items():
-                        if type(v) == dict:
-                            if k in target:
-                                target[k] = merge_build_info(target[k], v)
-                            else:
-                                v.pop("__REPLACE__", None)
-                                # merge v with "nothing" just to make sure to remove any "__REPLACE__"
-                                v = merge_build_info({}, v)
-                                target[k] = v
+            # any existing data (well... except if it's explicitely specified).
+            # Only send what's changed, as dotted fields, instead of the whole doc
+            def build_info_fields(target, d, prefix=""):
+                fields = {}
+                for k, v in d.items():
+                    if type(v) == dict and type(target.get(k)) == dict:
+                        if "__REPLACE__" in v:
+                            v.pop("__REPLACE__")
+                            fields[prefix + k] = v
                         else:
-                            target[k] = v
-                return target
-
-            build = merge_build_info(build, build_info)
-            src_build.replace_one({"_id": build["_id"]}, build)
+                            fields.update(
+                                build_info_fields(target[k], v,
+                                                  "%s%s." % (prefix, k)))
+                    elif type(v) == dict:
+                        fields[prefix + k] = clean_build_info(v)
+                    else:
+                        fields[prefix + k] = v
+                return fields
+
+            build_info.pop("_id", None)
+            upd.update(build_info_fields(build, build_info))
+            src_build.update_one({"_id": target_name}, {"$set": upd})
 
     def clean_old_collections(self):
         # use target_name is given, otherwise build name will be used
         # as collection name prefix, so they should start like that
         prefix = "%s_" % (self.target_name or self.build_name)
         db = mongo.get_target_db()
-        cols = [c for c in db.collection_names() if c.startswith(prefix)]
-        # timestamp is what's after _archive_, YYYYMMDD, so we can sort it safely
+        # let the server filter on prefix instead of listing all collections
+        cols = db.list_collection_names(
+            filter={"name": {"$regex": "^%s" % re.escape(prefix)}})
+        # build version (timestamp, YYYYMMDD by default) is what's after the prefix,
+        # so we can sort it safely
         cols = sorted(cols, reverse=True)
         to_drop = cols[self.keep_archive:]
         for colname in to_drop:
@@ -384,6 +401,8 @@ class DataBuilder(object):
         return None
 
     def get_root_document_sources(self):
+        if self._state["root_sources"] is not None:
+            return self._state["root_sources"]
         root_srcs = self.build_config.get(self.doc_root_key, []) or []
         # check for "not this resource" and adjust the list
         none_root_srcs = [
@@ -400,6 +419,7 @@ class DataBuilder(object):
 
         # resolve possible regex based source name (split-collections sources)
         root_srcs = self.resolve_sources(root_srcs)
+        self._state["root_sources"] = root_srcs
         return root_srcs
 
     def setup(self, sources=None, target_name=None):
@@ -489,10 +509,12 @@ class DataBuilder(object):
         """
         if type(sources) == str:
             sources = [sources]
-        src_db = mongo.get_src_db()
-        cols = src_db.collection_names()
+        if self._state["src_collections"] is None:
+            src_db = mongo.get_src_db()
+            self._state["src_collections"] = src_db.collection_names()
+        cols = self._state["src_collections"]
         masters = self.source_backend.get_src_master_docs()
-        found = []
+        searches = []
         for src in sources:
             # check if master _id and name are different (meaning name is a regex)
             master = masters.get(src)
@@ -502,11 +524,13 @@ class DataBuilder(object):
             search = src
             if master["_id"] != master["name"]:
                 search = master["name"]
-            # restrict pattern to minimal match
-            pat = re.compile("^%s$" % search)
-            for col in cols:
-                if pat.match(col):
-                    found.append(col)
+            searches.append(search)
+        if not searches:
+            return []
+        # one pattern for all sources, so collections are scanned only once.
+        # restrict pattern to minimal match
+        pat = re.compile("^(?:%s)$" % "|".join("(?:%s)" % search for search in searches))
+        found = [col for col in cols if pat.match(col)]
         return found
 
     def merge(self,
@@ -536,6 +560,10 @@ class DataBuilder(object):
         if type(steps) == str:
             steps = [steps]
         self.t0 = time.time()
+        # sources/collections may have changed since last merge
+        self._state["root_sources"] = None
+        self._state["src_collections"] = None
+        self._state["mapper_patterns"] = None
         self.check_ready(force)
         # normalize
         avail_sources = self.build_config['sources']
@@ -665,12 +693,15 @@ class DataBuilder(object):
     def get_mapper_for_source(self, src_name, init=True):
         # src_name can be a regex (when source has split collections, they are merge but
         # comes from the same "template" sourcek
-        docs = self.source_backend.get_src_master_docs()
+        if self._state["mapper_patterns"] is None:
+            docs = self.source_backend.get_src_master_docs()
+            self._state["mapper_patterns"] = [
+                (re.compile("^%s$" % master_name), docs[master_name].get("mapper"))
+                for master_name in docs]
         mapper_name = None
-        for master_name in docs:
-            pat = re.compile("^%s$" % master_name)
+        for pat, master_mapper in self._state["mapper_patterns"]:
             if pat.match(src_name):
-                mapper_name = docs[master_name].get("mapper")
+                mapper_name = master_mapper
         # TODO: this could be a list
         try:
             init and self.init_mapper(mapper_name)
@@ -728,36 +759,30 @@ class DataBuilder(object):
 
         @asyncio.coroutine
         def merge(src_names):
-            jobs = []
-            for i, src_name in enumerate(src_names):
+            # sources are merged one after the other, so results can directly
+            # be collected here, no need for a done-callback per source
+            for src_name in src_names:
                 yield from asyncio.sleep(0.0)
-                job = self.merge_source(src_name,
-                                        batch_size=batch_size,
-                                        ids=ids,
-                                        job_manager=job_manager)
-                job = asyncio.ensure_future(job)
-
-                def merged(f, name, stats):
-                    try:
-                        res = f.result()
-                        stats.update(res)
-                    except Exception as e:
-                        self.logger.exception(
-                            "Failed merging source '%s': %s" % (name, e))
-                        nonlocal got_error
-                        got_error = e
-
-                job.add_done_callback(
-                    partial(merged, name=src_name, stats=self.merge_stats))
-                jobs.append(job)
-                yield from asyncio.wait([job])
-                # raise error as soon as we know something went wrong
-                if got_error:
-                    raise got_error
-            tasks = asyncio.gather(*jobs)
-            yield from tasks
+                try:
+                    res = yield from self.merge_source(src_name,
+                                                       batch_size=batch_size,
+                                                       ids=ids,
+                                                       job_manager=job_manager)
+                except Exception as e:
+                    # raise error as soon as we know something went wrong
+                    self.logger.exception(
+                        "Failed merging source '%s': %s" % (src_name, e))
+                    raise
+                # one total per source ({src_name: cnt}, batches are already
+                # summed by merge_source()), so nothing gets overwritten here
+                self.merge_stats.update(res)
 
         if do_merge:
+            # root and other sources can't be merged concurrently: other sources
+            # only update documents created by root sources. Without root sources
+            # defined, root_sources is empty and everything is in other_sources.
+            # Sources within each group are also merged one after the other, as
+            # concurrent upserts on the same _ids would collide.
             if root_sources:
                 self.register_status("building",
                                      transient=True,
@@ -865,23 +890,24 @@ class DataBuilder(object):
                 % src_name)
         jobs = []
         total = self.source_backend[src_name].count()
-        btotal = math.ceil(total / batch_size)
+        if total == 0:
+            self.logger.info("Source '%s' is empty, nothing to merge" % src_name)
+            return {"%s" % src_name: 0}
+        btotal = (total + batch_size - 1) // batch_size
         bnum = 1
         cnt = 0
         got_error = False
-        # grab ids only, so we can get more, let's say 10 times more
-        id_batch_size = batch_size * 10
+        # id providers directly yield batches of merger job size, no need to
+        # fetch bigger batches of _ids and split them again
+        id_batch_size = batch_size
         if ids:
             self.logger.info(
                 "Merging '%s' specific list of _ids, create merger job with batch_size=%d"
                 % (src_name, batch_size))
-            id_provider = [ids]
         else:
             self.logger.info(
                 "Fetch _ids from '%s' with batch_size=%d, and create merger job with batch_size=%d"
                 % (src_name, id_batch_size, batch_size))
-            id_provider = id_feeder(self.source_backend[src_name],
-                                    batch_size=id_batch_size)
 
         if _query and ids is not None:
             self.logger.info(
@@ -913,38 +939,60 @@ class DataBuilder(object):
                          (src_name, merger))
 
         doc_cleaner = self.document_cleaner(src_name)
-        for big_doc_ids in id_provider:
-            for doc_ids in iter_n(big_doc_ids, batch_size):
-                # try to put some async here to give control back
-                # (but everybody knows it's a blocking call: doc_feeder)
-                yield from asyncio.sleep(0.1)
-                cnt += len(doc_ids)
-                pinfo = self.get_pinfo()
-                pinfo["step"] = src_name
-                pinfo["description"] = "#%d/%d (%.1f%%)" % (bnum, btotal,
-                                                            (cnt / total * 100))
-                self.logger.info("Creating merger job #%d/%d, to process '%s' %d/%d (%.1f%%)" %
-                                 (bnum, btotal, src_name, cnt, total, (cnt/total*100.)))
-                job = yield from job_manager.defer_to_process(
-                    pinfo,
-                    partial(merger_worker, self.source_backend[src_name].name,
-                            self.target_backend.target_name, doc_ids,
-                            self.get_mapper_for_source(src_name, init=False),
-                            doc_cleaner, upsert, merger, bnum))
-
-                def batch_merged(f, batch_num):
-                    nonlocal got_error
-                    if type(f.result()) != int:
-                        got_error = Exception(
-                            "Batch #%s failed while merging source '%s' [%s]" %
-                            (batch_num, src_name, f.result()))
-
-                job.add_done_callback(partial(batch_merged, batch_num=bnum))
-                jobs.append(job)
-                bnum += 1
-                # raise error as soon as we know
-                if got_error:
-                    raise got_error
+        mapper = self.get_mapper_for_source(src_name, init=False)
+        src_col_name = self.source_backend[src_name].name
+        # merger jobs are mostly I/O bound (fetching and storing docs) unless
+        # documents need heavy processing, only pay for a process in that case
+        if mapper.cpu_bound or doc_cleaner:
+            defer = job_manager.defer_to_process
+            throttle = None  # process jobs are throttled by job manager's constraints
+        else:
+            defer = job_manager.defer_to_thread
+            # thread jobs aren't, cap batches in flight so _ids aren't all fetched
+            # and queued at once. Thread pool is also the loop's default executor
+            # (hub db calls, pending flags polling...), keep a worker for it
+            throttle = asyncio.Semaphore(max(1, job_manager.num_threads - 1))
+        # arguments invariant for the whole source are bound once,
+        # only the batch of _ids and its number change for each job
+        worker = partial(merger_worker, src_col_name,
+                         self.target_backend.target_name, mapper=mapper,
+                         cleaner=doc_cleaner, upsert=upsert, merger=merger)
+
+        def batch_merged(f, batch_num):
+            nonlocal got_error
+            if throttle:
+                throttle.release()
+            if type(f.result()) != int:
+                got_error = Exception(
+                    "Batch #%s failed while merging source '%s' [%s]" %
+                    (batch_num, src_name, f.result()))
+
+        for doc_ids in id_provider:
+            # try to put some async here to give control back
+            # (but everybody knows it's a blocking call: doc_feeder)
+            yield from asyncio.sleep(0.1)
+            cnt += len(doc_ids)
+            pinfo = self.get_pinfo()
+            pinfo["step"] = src_name
+            pinfo["description"] = "#%d/%d (%.1f%%)" % (bnum, btotal,
+                                                        (cnt / total * 100))
+            self.logger.info("Creating merger job #%d/%d, to process '%s' %d/%d (%.1f%%)",
+                             bnum, btotal, src_name, cnt, total, cnt / total * 100)
+            if throttle:
+                yield from throttle.acquire()
+            try:
+                job = yield from defer(
+                    pinfo, partial(worker, ids=doc_ids, batch_num=bnum))
+            except Exception:
+                if throttle:
+                    throttle.release()
+                raise
+            job.add_done_callback(partial(batch_merged, batch_num=bnum))
+            jobs.append(job)
+            bnum += 1
+            # raise error as soon as we know
+            if got_error:
+                raise got_error
         self.logger.info("%d jobs created for merging step" % len(jobs))
         tasks = asyncio.gather(*jobs)
 
@@ -1041,11 +1089,28 @@ def fix_batch_duplicates(docs, fail_if_struct_is_different=False):
     return list(dids.values())
 
 
+# source/target databases used by merger_worker, per process ID
+merger_dbs = {}
+
+
+def get_merger_dbs():
+    """
+    Return (source db, target db) used by merger_worker. Connections are
+    created once per process (and shared by threads), then reused by
+    subsequent merger jobs running in that process.
+    """
+    pid = os.getpid()
+    if pid not in merger_dbs:
+        # anything else was inherited from a parent process, can't be used after fork
+        merger_dbs.clear()
+        merger_dbs[pid] = (mongo.get_src_db(), mongo.get_target_db())
+    return merger_dbs[pid]
+
+
 def merger_worker(col_name, dest_name, ids, mapper, cleaner, upsert, merger,
                   batch_num):
     try:
-        src = mongo.get_src_db()
-        tgt = mongo.get_target_db()
+        src, tgt = get_merger_dbs()
         col = src[col_name]
         dest = DocMongoBackend(tgt, tgt[dest_name])
         cur = doc_feeder(col,
@@ -1073,7 +1138,8 @@ def merger_worker(col_name, dest_name, ids, mapper, cleaner, upsert, merger,
             for d in stored_docs:
                 ddocs[d["_id"]] = merge_struct(d, ddocs[d["_id"]])
             docs = list(ddocs.values())
-        cnt = dest.update(docs, upsert=upsert)
+        # _ids are unique within the batch at this point, order doesn't matter
+        cnt = dest.update(docs, upsert=upsert, ordered=False)
         return cnt
     except Exception as e:
         logger_name = "build_%s_%s_batch_%s" % (dest_name, col_name, batch_num)
@@ -1083,14 +1149,17 @@ def merger_worker(col_name, dest_name, ids, mapper, cleaner, upsert, merger,
                      + "mapper: %s, cleaner: %s, upsert: %s, " % (mapper, cleaner, upsert)
                      + "merger: %s, batch_num: %s" % (merger, batch_num))
         exc_fn = os.path.join(btconfig.LOG_FOLDER, "%s.exc.pick" % logger_name)
-        pickle.dump(e, open(exc_fn, "wb"))
+        with open(exc_fn, "wb") as pickf:
+            pickle.dump(e, pickf, protocol=pickle.HIGHEST_PROTOCOL)
         logger.info("Exception was dumped in pickle file '%s'" % exc_fn)
         ids_fn = os.path.join(btconfig.LOG_FOLDER, "%s.ids.pick" % logger_name)
-        pickle.dump(ids, open(ids_fn, "wb"))
+        with open(ids_fn, "wb") as pickf:
+            pickle.dump(ids, pickf, protocol=pickle.HIGHEST_PROTOCOL)
         logger.info("IDs dumped in pickle file '%s'" % ids_fn)
         dat_fn = os.path.join(btconfig.LOG_FOLDER,
                               "%s.docs.pick" % logger_name)
-        pickle.dump(docs, open(dat_fn, "wb"))
+        with open(dat_fn, "wb") as pickf:
+            pickle.dump(docs, pickf, protocol=pickle.HIGHEST_PROTOCOL)
         logger.info("Data (batch of docs) dumped in pickle file '%s'" % dat_fn)
         raise
 
@@ -1106,6 +1175,10 @@ def set_pending_to_build(conf_name=None):
 
 
 class BuilderManager(BaseManager):
+
+    # cached build configurations can be edited from outside the manager
+    build_config_ttl = 10
+
     def __init__(self,
                  source_backend_factory=None,
                  target_backend_factory=None,
@@ -1135,6 +1208,9 @@ class BuilderManager(BaseManager):
             self.arg_builder_classes = [builder_class]
         self.default_builder_class = self.arg_builder_classes[0] or DataBuilder
         self.builder_classes = {}
+        # build configuration docs (and their resolved builder class) per _id,
+        # (re)loaded by configure(), expiring after build_config_ttl seconds
+        self.build_configs = {}
         self.poll_schedule = poll_schedule
         self.setup_log()
 
@@ -1152,22 +1228,27 @@ class BuilderManager(BaseManager):
             if dirty:
                 src_build.replace_one({"_id": build["_id"]}, build)
 
+    # default backends are partials, each builder calls them to get its own backend
+    # instances (see DataBuilder.prepare()), so they can be shared by all builders
+    default_source_backend = partial(SourceDocMongoBackend,
+                                     build_config=partial(get_src_build_config),
+                                     build=partial(get_src_build),
+                                     master=partial(get_src_master),
+                                     dump=partial(get_src_dump),
+                                     sources=partial(mongo.get_src_db))
+    default_target_backend = partial(TargetDocMongoBackend,
+                                     target_db=partial(mongo.get_target_db))
+
     @property
     def source_backend(self):
         source_backend = self.source_backend_factory and self.source_backend_factory() or \
-            partial(SourceDocMongoBackend,
-                    build_config=partial(get_src_build_config),
-                    build=partial(get_src_build),
-                    master=partial(get_src_master),
-                    dump=partial(get_src_dump),
-                    sources=partial(mongo.get_src_db))
+            self.default_source_backend
         return source_backend
 
     @property
     def target_backend(self):
         target_backend = self.target_backend_factory and self.target_backend_factory() or \
-            partial(TargetDocMongoBackend,
-                    target_db=partial(mongo.get_target_db))
+            self.default_target_backend
         return target_backend
 
     def get_builder_class(self, build_config_name):
@@ -1177,8 +1258,12 @@ class BuilderManager(BaseManager):
         2. or defined in the builder manager (so, per manager)
         3. or default to DataBuilder
         """
+        entry = self.get_build_config_entry(build_config_name)
+        # resolved once per cached configuration, so again when it's reloaded
+        if entry and entry.get("builder_class"):
+            return entry["builder_class"]
         builder_class = None
-        conf = self.src_build_config.find_one({"_id": build_config_name})
+        conf = entry and entry["conf"] or {}
         if conf.get("builder_class"):
             builder_class = self.builder_classes[
                 conf["builder_class"]]["class"]
@@ -1186,25 +1271,62 @@ class BuilderManager(BaseManager):
             builder_class = self.default_builder_class
         else:
             builder_class = DataBuilder
+        if entry:
+            entry["builder_class"] = builder_class
+            self.logger.info("Build config '%s' will use builder class %s",
+                             build_config_name, builder_class)
 
         return builder_class
 
+    def get_build_config_entry(self, build_name):
+        entry = self.build_configs.get(build_name)
+        if entry and time.time() - entry["loaded_at"] >= self.build_config_ttl:
+            entry = None
+        if entry is None:
+            self.build_configs.pop(build_name, None)
+            conf = self.src_build_config.find_one({"_id": build_name})
+            if conf:
+                entry = self.cache_build_config(conf)
+        return entry
+
+    def cache_build_config(self, conf):
+        entry = {"conf": conf, "loaded_at": time.time(), "builder_class": None}
+        self.build_configs[conf["_id"]] = entry
+        return entry
+
+    def invalidate_build_config(self, build_name=None):
+        """
+        Drop cached build configuration named build_name (or all if None),
+        so it's read from hub db again on next use.
+        """
+        if build_name is None:
+            self.build_configs = {}
+        else:
+            self.build_configs.pop(build_name, None)
+
+    def get_build_config(self, build_name):
+        """
+        Return build configuration document named build_name. Configurations
+        are cached when registered (see configure()) and for build_config_ttl
+        seconds, hub db is queried for unknown or expired ones. Returned document
+        is a copy, cache isn't affected if it's modified.
+        """
+        entry = self.get_build_config_entry(build_name)
+        return entry and copy.deepcopy(entry["conf"])
+
     def register_builder(self, build_name):
         # will use partial to postponse object creations and their db connection
         # as we don't want to keep connection alive for undetermined amount of time
         # declare source backend
         def create(build_name):
-            # postpone config import so app had time to set it up
-            # before actual call time
-            from biothings import config
-            # assemble the whole
+            # builder class is resolved once per cached build config
+            # (see get_builder_class())
             klass = self.get_builder_class(build_name)
-            self.logger.info("Build config '%s' will use builder class %s",
-                             build_name, klass)
+            # config is read at call time, so app had time to set it up
             bdr = klass(build_name,
                         source_backend=self.source_backend,
                         target_backend=self.target_backend,
-                        log_folder=config.LOG_FOLDER)
+                        log_folder=btconfig.LOG_FOLDER)
 
             return bdr
 
@@ -1283,7 +1405,9 @@ class BuilderManager(BaseManager):
         Return an instance of a builder for the build named 'build_name'
         Note: each call returns a different instance (factory call behind the scene...)
         """
-        # we'll get a partial class but will return an instance
+        # we'll get a partial class but will return an instance. Factories are
+        # already stored per build name (see register_builder()), so that's a
+        # plain dict lookup, no need to memoize it
         pclass = BaseManager.__getitem__(self, build_name)
         return pclass()
 
@@ -1291,7 +1415,9 @@ class BuilderManager(BaseManager):
         """Sync with src_build_config and register all build config"""
         self.register = {}
         self.builder_classes = {}
+        self.build_configs = {}
         for conf in self.src_build_config.find():
+            self.cache_build_config(conf)
             self.register_builder(conf["_id"])
         self.find_builder_classes()
 
@@ -1374,7 +1500,7 @@ class BuilderManager(BaseManager):
         """
         List all registered sources used to trigger a build named 'build_name'
         """
-        info = self.src_build_config.find_one({"_id": build_name})
+        info = self.get_build_config(build_name)
         return info and info["sources"] or []
 
     def whatsnew(self, build_name=None, old=None):
@@ -1481,16 +1607,43 @@ class BuilderManager(BaseManager):
         "build_name" at given date (or any date is none given -- carefull...).
         Date is a string (YYYYMMDD or regex)
         Common collection name prefix can also be specified if needed.
+        Collections are dropped in background, returned task's result is the list
+        of drop results (failed drops are exceptions, also logged as errors).
         """
         target_db = mongo.get_target_db()
-        for col_name in target_db.collection_names():
-            search = prefix and prefix + "_" or ""
-            search += build_name + '_'
-            search += date and date + '_' or ''
-            pat = re.compile(search)
-            if pat.match(col_name) and 'current' not in col_name:
+        # names are literal, date can be a regex
+        search = "^%s%s_%s" % (prefix and re.escape(prefix) + "_" or "",
+                               re.escape(build_name),
+                               date and date + "_" or "")
+        loop = self.job_manager.loop
+
+        @asyncio.coroutine
+        def do():
+            # let the server select matching collections instead of listing them all
+            # (db calls are blocking, they're run in the job manager's default executor)
+            col_names = yield from loop.run_in_executor(
+                None, partial(target_db.list_collection_names,
+                              filter={"name": {"$regex": search, "$not": re.compile("current")}}))
+            # drop them concurrently (thread pool bounding how many drops run at once)
+            drops = []
+            for col_name in col_names:
                 logging.info("Dropping target collection '%s" % col_name)
-                target_db[col_name].drop()
+                drops.append(loop.run_in_executor(None, target_db[col_name].drop))
+            # one failed drop shouldn't prevent the others from being reported
+            res = yield from asyncio.gather(*drops, return_exceptions=True)
+            for col_name, r in zip(col_names, res):
+                if isinstance(r, Exception):
+                    logging.error("Can't drop target collection '%s': %s" % (col_name, r))
+            return res
+
+        def done(f):
+            # nobody may be waiting for the task, don't let errors go unnoticed
+            if not f.cancelled() and f.exception():
+                logging.error("Can't clean temp collections for build '%s': %s" % (build_name, f.exception()))
+
+        task = asyncio.ensure_future(do(), loop=loop)
+        task.add_done_callback(done)
+        return task
 
     def poll(self):
         """
@@ -1291,7 +1291,7 @@ class DifferManager(BaseManager):
         }
 
     def poll(self, state, func):
-        super(DifferManager, self).poll(state, func, col=get_src_build())
+        return super(DifferManager, self).poll(state, func, col=get_src_build())
 
     def trigger_diff(self, diff_type, doc, **kwargs):
         """
@@ -9,6 +9,10 @@ class BaseMapper(object):
     process/convert/whatever passed documents
     """
 
+    # whether processing docs is CPU intensive. If not, merger jobs are mostly
+    # waiting on databases and can run in threads instead of processes
+    cpu_bound = True
+
     def __init__(self, name=None, *args, **kwargs):
         self.name = name
 
@@ -86,6 +90,8 @@ class IDBaseMapper(BaseMapper):
 
 class TransparentMapper(BaseMapper):
 
+    cpu_bound = False
+
     def load(self, *args, **kwargs):
         pass
 
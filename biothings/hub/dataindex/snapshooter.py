@@ -478,7 +478,7 @@ class SnapshotManager(BaseManager):
 
     # override
     def poll(self, state, func):
-        super().poll(state, func, col=get_src_build())
+        return super().poll(state, func, col=get_src_build())
 
     def configure(self, snapshot_confdict):
         """
@@ -1288,7 +1288,7 @@ class ReleaseManager(BaseManager, BaseStatusRegisterer):
                                                self.log_folder)
 
     def poll(self, state, func):
-        super().poll(state, func, col=get_src_build())
+        return super().poll(state, func, col=get_src_build())
 
     def __getitem__(self, stage_env):
         """
@@ -32,6 +32,7 @@ def send_s3_file(localfile, s3key, overwrite=False, permissions=None, metadata=N
     '''save a localfile to s3 bucket with the given key.
        bucket is set via S3_BUCKET
        it also save localfile's lastmodified time in s3 file's metadata
+       returns the created key
     '''
     metadata = metadata or {}
     try:
@@ -60,6 +61,7 @@ def send_s3_file(localfile, s3key, overwrite=False, permissions=None, metadata=N
         k.set_contents_from_filename(localfile)
     if permissions:
         k.set_acl(permissions)
+    return k
 
 
 def send_s3_big_file(localfile, s3key, overwrite=False, acl=None,
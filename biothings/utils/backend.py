@@ -141,25 +141,21 @@ class DocMongoBackend(DocBackendBase):
             import pickle
             pickle.dump(e, open("err", "wb"))
 
-    def update(self, docs, upsert=False):
+    def update(self, docs, upsert=False, ordered=True):
         '''if id does not exist in the target_collection,
-            the update will be ignored except if upsert is True
+            the update will be ignored except if upsert is True.
+            ordered=False lets the server apply the updates in any order
+            (faster, only safe when docs have unique _ids)
         '''
-        bulk = self.target_collection.initialize_ordered_bulk_op()
-        at_least_one = False
-        for doc in docs:
-            at_least_one = True
-            op = bulk.find({'_id': doc["_id"]})
-            if upsert:
-                op = op.upsert()
-            op.update({"$set": doc})
-        if at_least_one:
-            res = bulk.execute()
+        from pymongo import UpdateOne
+        ops = [UpdateOne({'_id': doc["_id"]}, {"$set": doc}, upsert=upsert) for doc in docs]
+        if ops:
+            res = self.target_collection.bulk_write(ops, ordered=ordered)
             # if doc is the same, it'll be matched but not modified.
             # but for us, it's been processed. if upserted, then it can't be matched
             # before (so matched cound doesn't include upserted). finally, it's only update
             # ops, so don't count nInserted and nRemoved
-            return res["nMatched"] + res["nUpserted"]
+            return res.matched_count + res.upserted_count
         else:
             return 0
 
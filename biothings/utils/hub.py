@@ -13,9 +13,11 @@ import copy
 import asyncio
 import io
 import time
-from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, lru_cache
+from operator import itemgetter
 from pprint import pformat
-from collections import OrderedDict
+from collections import OrderedDict, deque
 
 from IPython import InteractiveShell
 
@@ -38,6 +40,18 @@ HUB_ENV = hasattr(config, "HUB_ENV") and config.HUB_ENV or ""    # default: prod
 VERSIONS = HUB_ENV and "%s-versions" % HUB_ENV or "versions"
 LATEST = HUB_ENV and "%s-latest" % HUB_ENV or "latest"
 
+# command line patterns used by HubShell.eval(), function name is what's before first "("
+# secure: command must be alpha only, argument with "," and "=", or no arg at all
+SECURE_CMD_PAT = re.compile(r'^([A-Za-z_]+)\(["\'\w\s=,.-]*\)$')
+CMD_PAT = re.compile(r'(.+?)\(.*\)')  # more permissive
+CMD_ARGS_PAT = re.compile(r'(.+?)\((.*)\)')
+
+
+@lru_cache(maxsize=256)
+def render_help(func):
+    """Documentation for given command, commands don't change so it's rendered once"""
+    return "\n" + pydoc.render_doc(func, title="Hub documentation: %s")
+
 
 def jsonreadify(cmd):
     newcmd = copy.copy(cmd)
@@ -70,6 +84,12 @@ class CommandDefinition(dict):
 class HubShell(InteractiveShell):
 
     launched_commands = {}
+    # command string => number of launched commands with that string, still running
+    running_cmds = {}
+    # commands not marked as done yet, by ID. IDs are increasing
+    # so insertion order is ID order
+    running_ids = OrderedDict()
+    finished_ids = deque()  # IDs of commands which jobs all completed, fed by job_done()
     pending_outputs = {}
     cmd_cnt = None
     cmd = None  # "cmd" collection
@@ -81,6 +101,7 @@ class HubShell(InteractiveShell):
         self.extra_ns = OrderedDict()
         self.tracked = {}   # command calls kept in history or not
         self.hidden = {}    # not returned by help()
+        self.help_index = (None, None)  # (number of commands, rendered help())
         self.origout = sys.stdout
         self.buf = io.StringIO()
         self.shellog = ShellLogger(name="shell")
@@ -216,13 +237,13 @@ class HubShell(InteractiveShell):
         Display help on given function/object or list all available commands
         """
         if not func:
-            cmds = "\nAvailable commands:\n\n"
-            for k in self.commands:
-                if self.hidden[k]:
-                    continue
-                cmds += "\t%s\n" % k
-            cmds += "\nType: 'help(command)' for more\n"
-            return cmds
+            # rendered again only if commands were registered since
+            if self.help_index[0] != len(self.commands):
+                cmds = "\nAvailable commands:\n\n"
+                cmds += "".join(["\t%s\n" % k for k in self.commands if not self.hidden[k]])
+                cmds += "\nType: 'help(command)' for more\n"
+                self.help_index = (len(self.commands), cmds)
+            return self.help_index[1]
         elif isinstance(func, partial):
             docstr = "\n" + pydoc.render_doc(func.func, title="Hub documentation: %s")
             docstr += "\nDefined et as a partial, with:\nargs:%s\nkwargs:%s\n" % (repr(func.args), repr(func.keywords))
@@ -232,7 +253,11 @@ class HubShell(InteractiveShell):
             return docstr
         else:
             try:
-                return "\n" + pydoc.render_doc(func, title="Hub documentation: %s")
+                try:
+                    return render_help(func)
+                except TypeError:
+                    # unhashable, can't be cached
+                    return "\n" + pydoc.render_doc(func, title="Hub documentation: %s")
             except ImportError:
                 return "\nHelp not available for this command\n"
 
@@ -304,13 +329,18 @@ class HubShell(InteractiveShell):
         self.__class__.save_cmd(cmdnum, cmdinfo)
         self.__class__.cmd_cnt += 1
 
-        # TODO: clean up the following if statement, confirm with Sebastien
-        if type(result) == asyncio.tasks.Task or type(result) == asyncio.tasks._GatheringFuture or \
-                type(result) == asyncio.Future or \
-                type(result) == list and len(result) > 0 and type(result[0]) == asyncio.tasks.Task:
+        # tasks and gathering futures are futures too
+        if isinstance(result, asyncio.Future) or \
+                isinstance(result, list) and result and isinstance(result[0], asyncio.Future):
             # it's asyncio related
-            result = type(result) != list and [result] or result   # TODO: cleanup and confirm this line
+            result = not isinstance(result, list) and [result] or result
             cmdinfo["jobs"] = result
+            running = self.__class__.running_cmds
+            running[cmd] = running.get(cmd, 0) + 1
+            self.__class__.running_ids[cmdnum] = cmdinfo
+            # reported once, replaced by the final status when finished
+            self.__class__.pending_outputs[cmdnum] = "[%s] RUN {%s} %s" % (cmdnum, timesofar(cmdinfo["started_at"]), cmd)
+            self.__class__.job_done(cmdnum)
             return cmdinfo
         else:
             # ... and it's not asyncio related, we can display it directly
@@ -326,7 +356,7 @@ class HubShell(InteractiveShell):
         self.shellog.input(line)
         origline = line  # keep what's been originally entered
         # poor man's singleton...
-        if line in [j["cmd"] for j in self.__class__.launched_commands.values() if not j.get("is_done")]:
+        if line in self.__class__.running_cmds:
             raise AlreadyRunningException("Command '%s' is already running\n" % repr(line))
         # is it a hub command, in which case, intercept and run the actual declared cmd
         # IMPORTANT !!! this is where we allow the command or not when secure=True IMPORTANT !!!
@@ -334,12 +364,8 @@ class HubShell(InteractiveShell):
         # - what's before parenthesis must exactly match a command
         # - parenthesis are mandatory
         # - no '&&' operator allowed
-        if secure:
-            # command must be alpha only, argument with "," and "=", or no arg at all
-            pat = r'^([A-Za-z_]+)\(["\'\w\s=,.-]*\)$'
-        else:
-            pat = r'(.*)\(.*\)'  # more permissive
-        m = re.match(pat, line)
+        pat = secure and SECURE_CMD_PAT or CMD_PAT
+        m = pat.match(line)
         if m:
             cmd = m.groups()[0].strip()
             if secure and cmd not in self.commands:
@@ -353,23 +379,10 @@ class HubShell(InteractiveShell):
             raise CommandNotAllowed(line)
         # cmdline is the actual command sent to shell, line is the one displayed
         # they can be different if there's a preprocessing
-        cmdline = line
-        # && cmds ? ie. chained cmds
-        if "&&" in line:
-            chained_cmds = [cmd for cmd in map(str.strip, line.split("&&")) if cmd]
-            if len(chained_cmds) > 1:
-                # need to build a command with _and and using partial, meaning passing original func param
-                # to the partials
-                strcmds = []
-                for one_cmd in chained_cmds:
-                    func, args = re.match("(.*)\((.*)\)", one_cmd).groups()
-                    if args:
-                        strcmds.append("partial(%s,%s)" % (func, args))
-                    else:
-                        strcmds.append("partial(%s)" % func)
-                cmdline = "_and(%s)" % ",".join(strcmds)
-            else:
-                raise CommandError("Using '&&' operator required two operands\n")
+        if isinstance(line, CompositeCommand):
+            cmdline = line.get_cmdline()
+        else:
+            cmdline = build_cmdline(line)
         r = self.run_cell(cmdline, store_history=True)
         outputs = []
         if not r.success:
@@ -411,33 +424,56 @@ class HubShell(InteractiveShell):
     #def cancel(klass,jobnum):
     #    return klass.launched_commands.get(jobnum)
 
+    @classmethod
+    def job_done(cls, num, job=None):
+        """
+        Done callback for jobs of command 'num', waiting for them one after the other.
+        Once they're all done, command is queued and refresh_commands() processes
+        it right away (scheduled refresh is only a fallback), so it's not reported
+        as running anymore
+        """
+        for j in cls.launched_commands[num]["jobs"]:
+            if not j.done():
+                # jobs can be added while command is running (eg. chained with _and())
+                # so pending jobs are looked up again once this one is done
+                j.add_done_callback(partial(cls.job_done, num))
+                return
+        cls.finished_ids.append(num)
+        cls.refresh_commands()
+
     @classmethod
     def refresh_commands(cls):
-        for num, info in sorted(cls.launched_commands.items()):
-            # already process, this current command is now history
-            # Note: if we have millions of commands there, it could last quite a while,
-            # but IRL we only have a few
-            if info.get("is_done") == True:
-                continue
-            # is_done = set([j.done() for j in info["jobs"]]) == set([True])   # TODO: remove this line
-            is_done = {j.done() for j in info["jobs"]} == {True}
-            has_err = is_done and [True for j in info["jobs"] if j.exception()] or None
-            localoutputs = is_done and ([str(j.exception()) for j in info["jobs"] if j.exception()] or \
-                        [j.result() for j in info["jobs"]]) or None
-            if is_done:
-                cls.launched_commands[num]["is_done"] = True
-                cls.launched_commands[num]["failed"] = has_err and has_err[0] or False
-                cls.launched_commands[num]["results"] = localoutputs
-                cls.launched_commands[num]["finished_at"] = time.time()
-                cls.launched_commands[num]["duration"] = timesofar(t0=cls.launched_commands[num]["started_at"],
-                                                                   t1=cls.launched_commands[num]["finished_at"])
-                cls.save_cmd(num, cls.launched_commands[num])
+        finished = set()
+        while cls.finished_ids:
+            finished.add(cls.finished_ids.popleft())
+        # only finished commands are processed, running ones are left untouched
+        for num in sorted(finished):
+            info = cls.running_ids.pop(num, None)
+            if info is not None:
+                errors = []
+                results = []
+                for j in info["jobs"]:
+                    exc = j.exception()
+                    if exc:
+                        errors.append(str(exc))
+                    elif not errors:
+                        results.append(j.result())
+                has_err = bool(errors)
+                # errors if any, results otherwise
+                localoutputs = errors or results
+                info["is_done"] = True
+                info["failed"] = has_err
+                info["results"] = localoutputs
+                info["finished_at"] = time.time()
+                info["duration"] = timesofar(t0=info["started_at"], t1=info["finished_at"])
+                cls.save_cmd(num, info)
+                left = cls.running_cmds.pop(info["cmd"], 1) - 1
+                if left:
+                    cls.running_cmds[info["cmd"]] = left
                 if not has_err and localoutputs and set(map(type, localoutputs)) == {str}:
                     localoutputs = "\n" + "".join(localoutputs)
                 cls.pending_outputs[num] = "[%s] %s {%s} %s: finished %s " % \
                         (num, has_err and "ERR" or "OK", timesofar(info["started_at"]), info["cmd"], localoutputs)
-            else:
-                cls.pending_outputs[num] = "[%s] RUN {%s} %s" % (num, timesofar(info["started_at"]), info["cmd"])
 
     @classmethod
     def command_info(cls, id=None, running=None, failed=None):
@@ -549,45 +585,12 @@ def publish_data_version(s3_bucket, s3_folder, version_info, update_latest=True,
          "release_date" : "...",        # ISO 8601 timestamp, release date/time
          "url": "http...."}             # url pointing to release metadata
     """
-    # register version
-    versionskey = os.path.join(s3_folder, "%s.json" % VERSIONS)
-    try:
-        versions = aws.get_s3_file(versionskey,
-                                   return_what="content",
-                                   aws_key=aws_key,
-                                   aws_secret=aws_secret,
-                                   s3_bucket=s3_bucket)
-        versions = json.loads(versions.decode())  # S3 returns bytes
-    except (FileNotFoundError, json.JSONDecodeError):
-        versions = {"format": "1.0", "versions": []}
-    # if type(version_info) == list:     # remove this line
-    if isinstance(version_info, list):
-        versions["versions"] = version_info
-    else:
-        # used to check duplicates
-        tmp = {}
-        # [tmp.setdefault(e["build_version"], e) for e in versions["versions"]]   # TODO: remove this line
-        for e in versions["versions"]:
-            tmp.setdefault(e["build_version"], e)
-        tmp[version_info["build_version"]] = version_info
-        # order by build_version
-        versions["versions"] = sorted(tmp.values(), key=lambda e: e["build_version"])
-
-    aws.send_s3_file(None, versionskey,
-                     content=json.dumps(versions, indent=True),
-                     aws_key=aws_key,
-                     aws_secret=aws_secret,
-                     s3_bucket=s3_bucket,
-                     content_type="application/json",
-                     overwrite=True)
+    update_latest = not isinstance(version_info, list) and update_latest
+    latestkey = os.path.join(s3_folder, "%s.json" % LATEST)
 
-    # update latest
-    # if type(version_info) != list and update_latest:    # TODO: remove this line
-    if not isinstance(version_info, list) and update_latest:
-        latestkey = os.path.join(s3_folder, "%s.json" % LATEST)
-        key = None
+    def get_latest_key():
         try:
-            key = aws.get_s3_file(
+            return aws.get_s3_file(
                 latestkey,
                 return_what="key",
                 aws_key=aws_key,
@@ -595,8 +598,55 @@ def publish_data_version(s3_bucket, s3_folder, version_info, update_latest=True,
                 s3_bucket=s3_bucket
             )
         except FileNotFoundError:
-            pass
-        aws.send_s3_file(
+            return None
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # latest key lookup doesn't depend on versions, run it while versions is updated.
+        # latest itself is only updated once versions is, so it never points to an
+        # unregistered version
+        latest_future = update_latest and pool.submit(get_latest_key)
+
+        # register version
+        versionskey = os.path.join(s3_folder, "%s.json" % VERSIONS)
+        try:
+            versions = aws.get_s3_file(versionskey,
+                                       return_what="content",
+                                       aws_key=aws_key,
+                                       aws_secret=aws_secret,
+                                       s3_bucket=s3_bucket)
+            versions = json.loads(versions.decode())  # S3 returns bytes
+        except (FileNotFoundError, json.JSONDecodeError):
+            versions = {"format": "1.0", "versions": []}
+        # if type(version_info) == list:     # remove this line
+        if isinstance(version_info, list):
+            versions["versions"] = version_info
+        elif versions["versions"] and \
+                version_info["build_version"] > versions["versions"][-1]["build_version"]:
+            # common case: newer than any published version. Remote list is
+            # written sorted and without duplicates, so it just goes last
+            versions["versions"].append(version_info)
+        else:
+            # used to check duplicates
+            tmp = {}
+            for e in versions["versions"]:
+                tmp.setdefault(e["build_version"], e)
+            tmp[version_info["build_version"]] = version_info
+            # order by build_version
+            versions["versions"] = sorted(tmp.values(), key=itemgetter("build_version"))
+
+        aws.send_s3_file(None, versionskey,
+                         content=json.dumps(versions, indent=True),
+                         aws_key=aws_key,
+                         aws_secret=aws_secret,
+                         s3_bucket=s3_bucket,
+                         content_type="application/json",
+                         overwrite=True)
+
+        key = latest_future and latest_future.result()
+
+    # update latest
+    if update_latest:
+        sent_key = aws.send_s3_file(
             None, latestkey,
             content=json.dumps(version_info["build_version"], indent=True),
             content_type="application/json",
@@ -605,18 +655,33 @@ def publish_data_version(s3_bucket, s3_folder, version_info, update_latest=True,
             s3_bucket=s3_bucket,
             overwrite=True
         )
-        if not key:
-            key = aws.get_s3_file(
-                latestkey,
-                return_what="key",
-                aws_key=aws_key,
-                aws_secret=aws_secret,
-                s3_bucket=s3_bucket
-            )
+        # latest didn't exist before, use the one just created
+        key = key or sent_key
         newredir = os.path.join("/", s3_folder, "{}.json".format(version_info["build_version"]))
         key.set_redirect(newredir)
 
 
+def build_cmdline(line):
+    """
+    Return the command line actually sent to the shell for 'line',
+    that is, '&&' chained commands converted to a _and() call
+    """
+    if "&&" not in line:
+        return line
+    chained_cmds = [cmd for cmd in map(str.strip, line.split("&&")) if cmd]
+    if len(chained_cmds) > 1:
+        # need to build a command with _and and using partial, meaning passing original func param
+        # to the partials
+        matches = [CMD_ARGS_PAT.match(one_cmd) for one_cmd in chained_cmds]
+        if not all(matches):
+            raise CommandError("Chained commands must be calls, eg. 'a() && b()'\n")
+        # "func(args)" => "partial(func,args)", or "partial(func)" without args
+        return "_and(%s)" % ",".join(
+            ["partial(%s)" % ",".join(filter(None, m.groups())) for m in matches])
+    else:
+        raise CommandError("Using '&&' operator required two operands\n")
+
+
 def _and(*funcs):
     """
     Calls passed functions, one by one. If one fails, then it stops.
@@ -625,28 +690,26 @@ def _and(*funcs):
     Ex: _and(f1,f2,partial(f3,arg1,kw=arg2))
     """
     all_res = []
-    func1 = funcs[0]
-    func2 = None
-    fut1 = func1()
-    # if type(fut1) == list:   # TODO: remove this line
-    if isinstance(fut1, list):
-        assert len(fut1) == 1, "Can't deal with list of more than 1 task: %s" % fut1
-        fut1 = fut1.pop()
-    if not isinstance(fut1, asyncio.Future):
-        raise CommandError("First command didn't return a future, can't chain commands")
-    all_res.append(fut1)
-    # err = None
-    def do(f, cb):
-        f.result()  # consume exception if any
-        if cb:
-            all_res.extend(_and(cb, *funcs))
-    if len(funcs) > 1:
-        func2 = funcs[1]
-        if len(funcs) > 2:
-            funcs = funcs[2:]
-        else:
-            funcs = []
-    fut1.add_done_callback(partial(do, cb=func2))
+    remaining = deque(funcs)
+
+    def step(f=None):
+        if f is not None:
+            f.result()  # consume exception if any, chain stops there
+        if not remaining:
+            return
+        func = remaining.popleft()
+        fut = func()
+        if isinstance(fut, list):
+            assert len(fut) == 1, "Can't deal with list of more than 1 task: %s" % fut
+            fut = fut.pop()
+        if not isinstance(fut, asyncio.Future):
+            raise CommandError("Command %s didn't return a future, can't chain commands" % func)
+        # next future is added as soon as previous one is done, before
+        # any other done callback (eg. HubShell.job_done()) runs
+        all_res.append(fut)
+        fut.add_done_callback(step)
+
+    step()
     return all_res
 
 
@@ -658,6 +721,13 @@ class CompositeCommand(str):
     """
     def __init__(self, cmd):
         self.cmd = cmd
+        self.cmdline = None
+
+    def get_cmdline(self):
+        """Command line sent to the shell, built on first call only"""
+        if self.cmdline is None:
+            self.cmdline = build_cmdline(self)
+        return self.cmdline
 
     def __str__(self):
         return "<CompositeCommand: '%s'>" % self.cmd
@@ -720,10 +790,16 @@ class PyInotifyHubReloader(BaseHubReloader):
                     # watcher knows when directory is deleted (file descriptor become invalid),
                     # so no need to do it manually
             logging.error("Need to reload manager because of %s", event)
-            self.reload_func()
+            # notifier is the reloader itself, see PyInotifyHubReloader.__init__()
+            self.notifier.schedule_reload()
     
 
-    def __init__(self, paths, reload_func, wait=5, mask=None):
+    def __init__(self, paths, reload_func, wait=5, mask=None, debounce=1.0):
+        """
+        Events are read as soon as they're available, 'wait' isn't used anymore.
+        As several events usually come together (file saved, new source folder...),
+        reload_func is called once no other event occured for 'debounce' seconds
+        """
         pyinotify = sys.modules["pyinotify"] # get it from sys.modules or we'd need another "import"
                                              # just sure why...
         if isinstance(paths, str):
@@ -751,31 +827,30 @@ class PyInotifyHubReloader(BaseHubReloader):
         # propagate notifier so notifer itself can be reloaded (when new directory/source)
         self.listener.notifier = self
         self.wait = wait
-        self.do_monitor = False
+        self.debounce = debounce
+        self.reload_handle = None
+        self.loop = None
 
     def monitor(self):
+        logging.info(
+            "Monitoring source code in, %s:\n%s",
+            repr(self.paths),
+            pformat(self.watched_files())
+        )
+        self.loop = asyncio.get_event_loop()
 
-        @asyncio.coroutine
-        def do():
-            logging.info(
-                "Monitoring source code in, %s:\n%s",
-                repr(self.paths),
-                pformat(self.watched_files())
-            )
-            while self.do_monitor:
-                try:
-                    yield from asyncio.sleep(self.wait)
-                    # this reads events from OS
-                    if self.notifier.check_events(0.1):
-                        self.notifier.read_events()
-                    # Listener gets called there if event avail
-                    self.notifier.process_events()
-                except KeyboardInterrupt:
-                    logging.warning("Stop monitoring code")
-                    break
-
-        self.do_monitor = True
-        return asyncio.ensure_future(do())
+        def read():
+            # this reads events from OS, listener gets called there
+            self.notifier.read_events()
+            self.notifier.process_events()
+
+        # no polling, loop tells when there are events to read
+        self.loop.add_reader(self.watcher_manager.get_fd(), read)
+
+    def schedule_reload(self):
+        if self.reload_handle:
+            self.reload_handle.cancel()
+        self.reload_handle = self.loop.call_later(self.debounce, self.reload_func)
 
     def watched_files(self):
         return [v.path for v in self.watcher_manager.watches.values()]
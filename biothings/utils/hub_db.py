@@ -240,7 +240,9 @@ class ChangeListener(object):
 class ChangeWatcher(object):
 
     listeners = set()
-    event_queue = asyncio.Queue()
+    # created when publishing, so it's bound to the hub's loop
+    # (which can be set up after this module is imported)
+    event_queue = None
     do_publish = False
 
     col_entity = {
@@ -255,6 +257,8 @@ class ChangeWatcher(object):
     @classmethod
     def publish(cls):
         cls.do_publish = True
+        if cls.event_queue is None:
+            cls.event_queue = asyncio.Queue()
         @asyncio.coroutine
         def do():
             while cls.do_publish:
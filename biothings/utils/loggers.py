@@ -3,6 +3,9 @@ import time
 import datetime
 import logging
 import asyncio
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from functools import partial
 
 from .slack import slack_msg
@@ -23,9 +26,24 @@ def setup_default_log(default_logger_name, log_folder, level=logging.DEBUG):
     return logger
 
 
-def get_logger(logger_name, log_folder=None, handlers=("console", "file", "slack"), timestamp="%Y%m%d"):
+def queued_handler(handler):
+    """
+    Return a handler queuing records, actually emitted by given handler
+    from a dedicated thread, so logging calls don't wait on handler's I/O
+    """
+    que = queue.Queue(-1)
+    listener = QueueListener(que, handler, respect_handler_level=True)
+    listener.start()
+    # flush what's left in the queue
+    atexit.register(listener.stop)
+    return QueueHandler(que)
+
+
+def get_logger(logger_name, log_folder=None, handlers=("console", "file", "slack"), timestamp="%Y%m%d",
+               queued=False):
     """
     Configure a logger object from logger_name and return (logger, logfile)
+    If queued is True, file logging is done from a separate thread (see queued_handler())
     """
     from biothings import config as btconfig
     if not log_folder:
@@ -40,12 +58,13 @@ def get_logger(logger_name, log_folder=None, handlers=("console", "file", "slack
     fmt = logging.Formatter('%(asctime)s [%(process)d:%(threadName)s] - %(name)s - %(levelname)s -- %(message)s', datefmt="%H:%M:%S")
     logger = logging.getLogger(logger_name)
     logger.setLevel(logging.DEBUG)
-    if "file" in handlers:
+    if "file" in handlers and "logfile" not in [h.name for h in logger.handlers]:
         fh = logging.FileHandler(logfile)
         fh.setFormatter(fmt)
+        if queued:
+            fh = queued_handler(fh)
         fh.name = "logfile"
-        if fh.name not in [h.name for h in logger.handlers]:
-            logger.addHandler(fh)
+        logger.addHandler(fh)
 
     if "hipchat" in handlers:
         raise DeprecationWarning("Hipchat is dead...")
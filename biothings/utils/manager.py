@@ -8,6 +8,7 @@ import types
 import glob
 import time
 import datetime
+import traceback
 from functools import wraps, partial
 from pprint import pformat
 from collections import OrderedDict
@@ -16,6 +17,7 @@ import concurrent.futures
 import aiocron
 import dill as pickle
 import psutil
+from pymongo.errors import PyMongoError
 
 from biothings import config
 logger = config.logger
@@ -23,6 +25,10 @@ logger = config.logger
 from biothings.utils.mongo import get_src_conn
 from biothings.utils.common import timesofar, get_random_string, sizeof_fmt
 
+# pid/thread pickle files, see track() for filename format
+PID_FILE_PAT = re.compile(r".*/(\d+)_.*\.pickle")
+TID_FILE_PAT = re.compile(r".*/(Thread\w*-\d+)_.*\.pickle")
+
 
 def track(func):
     @wraps(func)
@@ -73,7 +79,6 @@ def track(func):
         }
         results = None
         exc = None
-        trace = None
         pidfile = None
         try:
             _id = None
@@ -89,9 +94,8 @@ def track(func):
             pickle.dump(worker, open(pidfile, "wb"))
             results = func(*args, **kwargs)
         except Exception as e:
-            import traceback
-            trace = traceback.format_exc()
-            logger.error("err %s\n%s", e, trace)
+            # traceback is formatted by the logger
+            logger.exception("err %s", e)
             # we want to store exception so for now, just make a reference
             exc = e
         finally:
@@ -117,11 +121,8 @@ def do_work(job_id, ptype, pinfo=None, func=None, *args, **kwargs):
 
 
 def find_process(pid):
-    g = psutil.process_iter()
-    for p in g:
-        if p.pid == pid:
-            break
-    return p
+    """Return psutil.Process for given pid, raise psutil.NoSuchProcess if not found"""
+    return psutil.Process(pid)
 
 
 class UnknownResource(Exception):
@@ -181,33 +182,198 @@ class BaseManager(object):
         '''
         Search for source in collection 'col' with a pending flag list
         containing 'state' and and call 'func' for each document found
-        (with doc as only param)
+        (with doc as only param). Search is triggered by changes in 'col'
+        if it supports change streams, or every poll_schedule otherwise
         '''
         if not self.poll_schedule:
             raise ManagerError("poll_schedule is not defined")
 
-        @asyncio.coroutine
-        def check_pending(state):
-            sources = [src for src in col.find({'pending': state}) if isinstance(src['_id'], str)]
-            if sources:
+        if hasattr(col, "create_index"):
+            # pending flags are queried often, only a few docs have them
+            try:
+                col.create_index("pending", background=True, sparse=True)
+            except PyMongoError as e:
+                logger.warning("Can't create index on pending flags in '%s': %s", col.name, e)
+
+        def pull_pending():
+            # that's polled often and usually nothing is pending, only fetch _ids
+            # (projection is ignored by hub db backends not supporting it)
+            src_ids = [src["_id"] for src in col.find({'pending': state}, projection={"_id": 1})
+                       if isinstance(src['_id'], str)]
+            if src_ids:
                 logger.info(
                     "Found %d resources with pending flag %s (%s)",
-                    len(sources), state, repr([src["_id"] for src in sources])
+                    len(src_ids), state, repr(src_ids)
                 )
-            for src in sources:
-                logger.info("Run %s for pending flag %s on source '%s'", func, state, src["_id"])
+            srcs = []
+            for src_id in src_ids:
+                # whole document is passed to func
+                src = col.find_one({"_id": src_id})
+                if not src or state not in src.get("pending", []):
+                    # deleted or processed in the meantime
+                    continue
+                # first reset flag to make sure we won't call func multiple time
+                col.update({"_id": src["_id"]}, {"$pull": {"pending": state}})
+                srcs.append(src)
+            return srcs
+
+        async def run_pending(state):
+            # queries are blocking, don't hold the loop while waiting for hub db
+            try:
+                srcs = await self.job_manager.loop.run_in_executor(None, pull_pending)
+            except Exception as e:
+                logger.exception("Can't get resources with pending flag %s: %s", state, e)
+                return {}
+            jobs = {}
+            for src in srcs:
+                src_id = src["_id"]
+                logger.info("Run %s for pending flag %s on source '%s'", func, state, src_id)
                 try:
-                    # first reset flag to make sure we won't call func multiple time
-                    col.update({"_id": src["_id"]}, {"$pull": {"pending": state}})
-                    func(src)
+                    res = func(src)
+                    if isinstance(res, asyncio.Future):
+                        jobs[src_id] = res
                 except ResourceNotFound:
                     logger.error("Resource '%s' has a pending flag set to %s but is not registered in manager",
-                                 src["_id"], state)
+                                 src_id, state)
+                except Exception as e:
+                    # don't prevent other pending resources from being processed
+                    logger.exception("Can't run %s for pending flag %s on source '%s': %s",
+                                     func, state, src_id, e)
+            return jobs
+
+        # one check at a time (cron ticks and change events can overlap while hub db is
+        # queried). Overlapping ones are skipped, but make the running one check again
+        checking = False
+        recheck = False
+
+        async def check_pending(state):
+            nonlocal checking, recheck
+            if checking:
+                recheck = True
+                return
+            checking = True
+            jobs = {}
+            try:
+                recheck = True
+                while recheck:
+                    recheck = False
+                    started = await run_pending(state)
+                    jobs.update(started)
+            finally:
+                checking = False
+            # jobs are still running, that's not part of the check itself
+            if jobs:
+                # jobs were all started by now, run concurrently. Wait for them
+                # so failures are reported
+                results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+                for src_id, res in zip(jobs, results):
+                    if isinstance(res, Exception):
+                        logger.error("%s failed for pending flag %s on source '%s': %s",
+                                     func, state, src_id, res)
+
+        def crontab():
+            return aiocron.crontab(
+                self.poll_schedule, func=partial(check_pending, state),
+                start=True, loop=self.job_manager.loop
+            )
+
+        # when hub db is a MongoDB replica set, react to changes instead of querying
+        # on each tick. Otherwise (standalone server, other hub db backends), poll
+        loop = self.job_manager.loop
+        watcher = None
+        if hasattr(col, "watch"):
+            try:
+                watcher = PendingFlagWatcher.get(col, loop)
+            except PyMongoError as e:
+                logger.debug("Can't watch changes on '%s' (%s), polling for pending flag %s", col.name, e, state)
+        if watcher is None:
+            return crontab()
+
+        watcher.register(state, lambda: asyncio.ensure_future(check_pending(state), loop=loop), crontab)
+        # flags could have been set before the stream was opened
+        asyncio.ensure_future(check_pending(state), loop=loop)
+        return watcher
 
-        return aiocron.crontab(
-            self.poll_schedule, func=partial(check_pending, state),
-            start=True, loop=self.job_manager.loop
-        )
+
+class PendingFlagWatcher(object):
+    """
+    Watch changes on a hub db collection (MongoDB change stream), notifying
+    pollers registered for the pending flags set in changed documents.
+    There's one watcher, that is one stream and one thread, per collection,
+    shared by all managers polling it. Like aiocron crontabs returned by
+    BaseManager.poll() otherwise, it can be stopped with stop()
+    """
+
+    # collection full name => watcher
+    watchers = {}
+    # only changes leaving pending flags in a document are relevant
+    PIPELINE = [{"$match": {
+        "operationType": {"$in": ["insert", "update", "replace"]},
+        "fullDocument.pending": {"$exists": True, "$ne": []}
+    }}]
+
+    @classmethod
+    def get(cls, col, loop):
+        """
+        Return watcher for collection 'col', creating it if needed
+        (raise PyMongoError if changes can't be watched)
+        """
+        key = getattr(col, "full_name", col.name)
+        if key not in cls.watchers:
+            cls.watchers[key] = cls(col, loop)
+        return cls.watchers[key]
+
+    def __init__(self, col, loop):
+        self.col = col
+        self.loop = loop
+        self.callbacks = {}  # pending flag => callbacks, called from the loop
+        self.fallbacks = []  # called from the loop if stream stops
+        self.crons = []  # returned by fallbacks, polling instead of the stream
+        self.stopped = False
+        # full document is needed on updates to get the flags
+        self.stream = col.watch(self.PIPELINE, full_document="updateLookup")
+        self.thread = threading.Thread(target=self.run, name="watch_%s" % col.name, daemon=True)
+
+    def register(self, state, callback, fallback):
+        self.callbacks.setdefault(state, []).append(callback)
+        self.fallbacks.append(fallback)
+        if not self.thread.is_alive():
+            self.thread.start()
+
+    def stop(self):
+        """
+        Stop watching changes (for all pollers registered on that collection),
+        and polling if stream had already stopped
+        """
+        self.stopped = True
+        self.__class__.watchers.pop(getattr(self.col, "full_name", self.col.name), None)
+        self.stream.close()
+        for cron in self.crons:
+            cron.stop()
+
+    def fall_back(self):
+        if not self.stopped:
+            self.crons = [fallback() for fallback in self.fallbacks]
+
+    def run(self):
+        # change streams are blocking iterators, that's running in a dedicated thread
+        try:
+            with self.stream:
+                for change in self.stream:
+                    pending = (change.get("fullDocument") or {}).get("pending") or []
+                    if isinstance(pending, str):
+                        pending = [pending]
+                    for state in set(pending):
+                        for callback in list(self.callbacks.get(state, [])):
+                            self.loop.call_soon_threadsafe(callback)
+        except Exception as e:
+            if self.stopped:
+                # stream closed by stop()
+                return
+            logger.warning("Change stream on '%s' stopped (%s), polling for pending flags %s instead",
+                           self.col.name, e, list(self.callbacks))
+            self.__class__.watchers.pop(getattr(self.col, "full_name", self.col.name), None)
+            self.loop.call_soon_threadsafe(self.fall_back)
 
 
 class BaseStatusRegisterer(object):
@@ -423,7 +589,6 @@ class BaseSourceManager(BaseManager):
                 self.register_source(src, fail_on_notfound=False)
             except (UnknownResource, ResourceError) as e:
                 logger.info("Can't register source '%s', skip it; %s", src, e)
-                import traceback
                 logger.error(traceback.format_exc())
 
 
@@ -525,9 +690,8 @@ class JobManager(object):
         # clean old/staled files
         children_pids = [p.pid for p in self.pchildren]
         active_tids = [t.getName() for t in self.thread_queue._threads]
-        pid_pat = re.compile(".*/(\d+)_.*\.pickle")  # see track() for filename format
         for fn in glob.glob(os.path.join(config.RUN_DIR, "*.pickle")):
-            pid = pid_pat.findall(fn)
+            pid = PID_FILE_PAT.findall(fn)
             if not pid:
                 continue
             try:
@@ -538,10 +702,9 @@ class JobManager(object):
             if pid not in children_pids:
                 logger.info("Removing staled pid file '%s'", fn)
                 os.unlink(fn)
-        tid_pat = re.compile(".*/(Thread\w*-\d+)_.*\.pickle")
         for fn in glob.glob(os.path.join(config.RUN_DIR, "*.pickle")):
             try:
-                tid = tid_pat.findall(fn)[0].split("_")[0]
+                tid = TID_FILE_PAT.findall(fn)[0].split("_")[0]
             except IndexError:
                 logger.warning("Invalid TID file '%s', skip it", fn)
                 raise
@@ -823,11 +986,10 @@ def %s():
     def get_pid_files(self, child=None):
         pids = {}
         try:
-            pat = re.compile(".*/(\d+)_.*\.pickle")  # see track() for filename format
             children_pids = [p.pid for p in self.pchildren]
             for fn in glob.glob(os.path.join(config.RUN_DIR, "*.pickle")):
                 try:
-                    pid = int(pat.findall(fn)[0].split("_")[0])
+                    pid = int(PID_FILE_PAT.findall(fn)[0].split("_")[0])
                     if not child or child.pid == pid:
                         try:
                             worker = pickle.load(open(fn, "rb"))
@@ -852,13 +1014,11 @@ def %s():
     def get_thread_files(self):
         tids = {}
         try:
-            # see track() for filename format
-            pat = re.compile(".*/(Thread\w*-\d+)_.*\.pickle")
             threads = self.thread_queue._threads
             active_tids = [t.getName() for t in threads]
             for fn in glob.glob(os.path.join(config.RUN_DIR, "*.pickle")):
                 try:
-                    tid = pat.findall(fn)[0].split("_")[0]
+                    tid = TID_FILE_PAT.findall(fn)[0].split("_")[0]
                     worker = pickle.load(open(fn, "rb"))
                     worker["process"] = self.hub_process  # misleading... it's the hub process
                     tids[tid] = worker
@@ -28,6 +28,8 @@ class DummyCollection(dotdict):
 class DummyDatabase(dotdict):
     def collection_names(self):
         return []
+    def list_collection_names(self, *args, **kwargs):
+        return []
     def __getitem__(self,what):
         return DummyCollection()
 
@@ -35,9 +37,41 @@ class DummyDatabase(dotdict):
 class Database(MongoClient,IDatabase):
 
     def __init__(self,dbname,*args,**kwargs):
-        super(Database,self).__init__(dbname)
+        super(Database,self).__init__(dbname,**kwargs)
         self.name = dbname
 
+
+# clients per (process ID, URI). A MongoClient is thread-safe and holds its own
+# connection pool, so one is shared within a process (but can't be used after fork)
+clients = {}
+
+def get_client_options():
+    """
+    Return options used to create MongoDB clients. Connection pool is sized
+    according to the number of hub workers (threads querying concurrently, plus
+    some room for the event loop and change streams), any option can be
+    set/overridden with config.MONGO_CLIENT_OPTIONS (dict of MongoClient kwargs)
+    """
+    options = {}
+    workers = getattr(config,"HUB_MAX_WORKERS",None)
+    if workers:
+        options["maxPoolSize"] = max(2 * workers, 20)
+    options.update(getattr(config,"MONGO_CLIENT_OPTIONS",None) or {})
+    return options
+
+def get_client(uri):
+    """
+    Return a Database client for given URI, created once per process
+    and reused by subsequent calls (config must be loaded, see requires_config)
+    """
+    pid = os.getpid()
+    if (pid,uri) not in clients:
+        # anything from another pid was inherited from a parent process
+        for key in [k for k in clients if k[0] != pid]:
+            clients.pop(key)
+        clients[(pid,uri)] = Database(uri,**get_client_options())
+    return clients[(pid,uri)]
+
 def requires_config(func):
     @wraps(func)
     def func_wrapper(*args,**kwargs):
@@ -60,7 +94,7 @@ def get_conn(server, port):
                                                  server, port)
         else:
             uri = "mongodb://{}:{}".format(server, port)
-        conn = Database(uri)
+        conn = get_client(uri)
         return conn
     except (AttributeError,ValueError) as e:
         # missing config variables (or invalid), we'll pretend it's a dummy access to mongo
@@ -72,7 +106,7 @@ def get_conn(server, port):
 
 @requires_config
 def get_hub_db_conn():
-    conn = Database(config.HUB_DB_BACKEND["uri"])
+    conn = get_client(config.HUB_DB_BACKEND["uri"])
     return conn
 
 @requires_config
@@ -144,7 +178,7 @@ def get_target_conn():
                                              config.DATA_TARGET_PORT)
     else:
         uri = "mongodb://{}:{}".format(config.DATA_TARGET_SERVER,config.DATA_TARGET_PORT)
-    conn = Database(uri)
+    conn = get_client(uri)
     return conn
 
 
@@ -167,9 +201,10 @@ def get_source_fullname(col_name):
     """
     src_dump = get_src_dump()
     # "sources" in config is a list a collection names. src_dump _id is the name of the
-    # resource but can have sub-resources with different collection names. We need
-    # to query inner keys upload.job.*.step, which always contains the collection name  
-    info = src_dump.find_one({"$where":"function() {if(this.upload) {for(var index in this.upload.jobs) {if(this.upload.jobs[index].step == \"%s\") return this;}}}" % col_name})
+    # resource but can have sub-resources with different collection names. Sub-resources
+    # are keyed by their collection name in upload.jobs, and upload.jobs.<name>.step always
+    # contains that collection name, so we can query it directly (no JS $where scan)
+    info = src_dump.find_one({"upload.jobs.%s.step" % col_name: col_name}, {"_id": 1})
     if info:
         name = info["_id"]
         if name != col_name:
@@ -323,7 +358,8 @@ def id_feeder(col, batch_size=1000, build_cache=True, logger=logging,
                 ts = ts and dtparser.parse(ts).timestamp()
         elif col.database.name == config.DATA_SRC_DATABASE:
             src_dump = get_src_dump()
-            info = src_dump.find_one({"$where":"function() {if(this.upload) {for(var index in this.upload.jobs) {if(this.upload.jobs[index].step == \"%s\") return this;}}}" % col.name})
+            info = src_dump.find_one({"upload.jobs.%s.step" % col.name: col.name},
+                                     {"upload.jobs.%s.started_at" % col.name: 1})
             if not info:
                 logger.warning("Can't find information for source collection '%s'" % col.name)
             else:
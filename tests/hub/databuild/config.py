@@ -0,0 +1,17 @@
+"""
+    Hub settings for testing (no MongoDB needed, hub db is a sqlite file).
+"""
+import logging
+import tempfile
+
+_TMP_FOLDER = tempfile.mkdtemp(prefix="biothings_test_")
+
+logger = logging.getLogger("biothings_test")
+
+HUB_DB_BACKEND = {
+    "module": "biothings.utils.sqlite3",
+    "sqlite_db_folder": _TMP_FOLDER,
+}
+DATA_HUB_DB_DATABASE = "unittest_builder"
+DATA_SRC_DATABASE = "unittest_src"
+LOG_FOLDER = _TMP_FOLDER
@@ -0,0 +1,87 @@
+"""
+    Test DataBuilder
+
+    merge_source(): _ids are fetched once, by a single id_feeder() call
+    yielding batches of merger job size.
+    pickle: connections, cached values and mappers aren't serialized.
+
+"""
+
+import asyncio
+import pickle
+import unittest
+from unittest import mock
+
+import biothings
+import config
+biothings.config_for_app(config)
+
+from biothings.hub.databuild.builder import DataBuilder  # noqa: E402
+
+
+class TestMergeSource(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def prepare_builder(self):
+        # skip __init__(), only what merge_source() uses is set
+        # (backends are read-only properties, they're set in state)
+        builder = DataBuilder.__new__(DataBuilder)
+        builder.init_state()
+        source_backend = mock.MagicMock()
+        source_backend.__getitem__.return_value.count.return_value = 3
+        source_backend.master.find_one.return_value = {}
+        builder._state["logger"] = mock.MagicMock()
+        builder._state["source_backend"] = source_backend
+        builder._state["target_backend"] = mock.MagicMock()
+        builder.generate_document_query = mock.MagicMock(return_value=None)
+        builder.get_root_document_sources = mock.MagicMock(return_value=[])
+        builder.document_cleaner = mock.MagicMock(return_value=None)
+        builder.get_mapper_for_source = mock.MagicMock(return_value=mock.MagicMock(cpu_bound=False))
+        builder.get_pinfo = mock.MagicMock(return_value={})
+        return builder
+
+    def prepare_job_manager(self):
+        job_manager = mock.MagicMock(num_threads=2)
+
+        async def defer_to_thread(pinfo, func):
+            # merged batch, reporting one doc processed per _id
+            fut = asyncio.Future()
+            fut.set_result(len(func.keywords["ids"]))
+            return fut
+
+        job_manager.defer_to_thread = defer_to_thread
+        return job_manager
+
+    def test_01_id_feeder_called_once(self):
+        builder = self.prepare_builder()
+        job_manager = self.prepare_job_manager()
+        with mock.patch("biothings.hub.databuild.builder.id_feeder") as id_feeder:
+            id_feeder.return_value = iter([["a", "b"], ["c"]])
+            res = self.loop.run_until_complete(
+                builder.merge_source("src", batch_size=2, job_manager=job_manager))
+        id_feeder.assert_called_once()
+        self.assertEqual(id_feeder.call_args[1]["batch_size"], 2)
+        self.assertEqual(res, {"src": 3})
+
+
+class TestPickle(unittest.TestCase):
+
+    def test_01_state_not_pickled(self):
+        builder = DataBuilder("build", source_backend=None, target_backend=None, log_folder="/tmp")
+        builder._state["logger"] = "logger"  # not a real one, only checking it's dropped
+        builder._state["root_sources"] = ["src"]
+        builder.prepared = True
+        copied = pickle.loads(pickle.dumps(builder))
+        self.assertEqual(copied.build_name, "build")
+        self.assertEqual(set(copied._state.values()), {None})
+        self.assertEqual(copied.mappers, {})
+        self.assertFalse(copied.prepared)
+        # original instance is left untouched
+        self.assertEqual(builder._state["root_sources"], ["src"])
+        self.assertTrue(builder.mappers)